@@ -1,6 +1,7 @@
 from flask import Flask
 from flask.json.provider import DefaultJSONProvider
 from enum import Enum
+from app.storage.db_service import orjson, json_dumps, json_loads
 
 class CustomJSONProvider(DefaultJSONProvider):
     def default(self, obj):
@@ -8,6 +9,24 @@ class CustomJSONProvider(DefaultJSONProvider):
             return obj.value
         return super().default(obj)
 
+    def dumps(self, obj, **kwargs):
+        # orjson handles str/int/float/bool/None, dates and enums natively;
+        # anything else (Decimal, dataclasses with custom fields) goes through default().
+        # Flask's responses ask for either compact separators or indent=2, which
+        # are orjson's default output and OPT_INDENT_2; other options fall back
+        options = dict(kwargs)
+        if options.get('separators') == (',', ':'):
+            del options['separators']
+        indent = options.pop('indent', None)
+        if orjson is None or options or indent not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        return json_dumps(obj, default=self.default, sort_keys=self.sort_keys, indent=indent == 2)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return json_loads(s)
+
 def create_app():
     """
     Creates, configures, and returns the Flask application.
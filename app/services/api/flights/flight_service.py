@@ -15,6 +15,10 @@ from .response_models import (
 
 logger = logging.getLogger(__name__)
 
+# Byte -> character tables for bytes.translate when building booking references
+_REFERENCE_LETTERS = bytes(ord('A') + b % 26 for b in range(256))
+_REFERENCE_DIGITS = bytes(ord('0') + b % 10 for b in range(256))
+
 
 class FlightService:
     """Provider-agnostic flight service orchestration with object-based responses"""
@@ -381,12 +385,13 @@ class FlightService:
     
     def _generate_booking_reference(self) -> str:
         """Generate unique booking reference"""
-        import random
-        import string
-        letters = ''.join(random.choices(string.ascii_uppercase, k=3))
-        numbers = ''.join(random.choices(string.digits, k=3))
-        suffix = ''.join(random.choices(string.ascii_uppercase, k=2))
-        reference = f"{letters}{numbers}{suffix}"
+        # Format ABC123DE (3 letters + 3 digits + 2 letters) from one urandom read
+        raw = os.urandom(8)
+        reference = (
+            raw[:3].translate(_REFERENCE_LETTERS)
+            + raw[3:6].translate(_REFERENCE_DIGITS)
+            + raw[6:].translate(_REFERENCE_LETTERS)
+        ).decode()
         
         logger.debug("Generated booking reference", extra={
             'booking_reference': reference
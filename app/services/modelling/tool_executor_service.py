@@ -4,9 +4,11 @@ import json
 import logging
 from decimal import Decimal
 from datetime import datetime
+from enum import Enum
 from dataclasses import is_dataclass, asdict
 from typing import List, Dict, Any, Callable, Optional
 from app.services.modelling.response_parser import ToolCall
+from app.storage.db_service import json_dumps
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
@@ -164,7 +166,7 @@ class ToolExecutorService:
                 
                 # Safe JSON serialization with dataclass support
                 try:
-                    json_output = json.dumps(result_data, default=self._json_serializer)
+                    json_output = json_dumps(self._to_json_value(result_data))
                     logger.debug(f"Successfully serialized result for tool '{tool_name}'")
                 except (TypeError, ValueError) as e:
                     # Fallback to string representation
@@ -192,6 +194,22 @@ class ToolExecutorService:
         logger.info(f"Successfully formatted tool results for model. Full tool_results block is {tool_results_block}")
         return tool_results_block
 
+    def _to_json_value(self, obj: Any) -> Any:
+        """
+        Convert a tool result into plain JSON types before serializing.
+        orjson encodes dataclasses, datetimes and enums natively and never
+        calls a default hook for them, so they go through _json_serializer here.
+        """
+        if isinstance(obj, Enum):
+            return self._to_json_value(obj.value)
+        if isinstance(obj, (str, int, float, bool, type(None))):
+            return obj
+        if isinstance(obj, dict):
+            return {key: self._to_json_value(value) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [self._to_json_value(value) for value in obj]
+        return self._to_json_value(self._json_serializer(obj))
+    
     def _json_serializer(self, obj: Any) -> Any:
         """Custom JSON serializer for complex objects"""
         # Handle dataclass objects
@@ -206,6 +224,10 @@ class ToolExecutorService:
         if isinstance(obj, Decimal):
             return float(obj)
         
+        # Handle Enum members by their value
+        if isinstance(obj, Enum):
+            return obj.value
+        
         # Handle other common non-serializable types
         if hasattr(obj, '__dict__'):
             # Convert object to dict, handling nested dataclasses
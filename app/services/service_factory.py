@@ -52,6 +52,7 @@ class ServiceFactory:
         
         localization_manager = LocalizationManager()
         flight_service = FlightService(flight_storage_service, booking_storage_service, user_storage_service)
+        booking_storage_service.flight_service = flight_service
         flight_details_service = FlightDetailsService(flight_storage_service)
         
         payment_api_key = os.getenv("PAYMENT_API_KEY")
@@ -1,10 +1,86 @@
 import os
+import json
+import weakref
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable
 import psycopg2
+from psycopg2.extras import register_default_jsonb
+from psycopg2.pool import ThreadedConnectionPool
+
+# Try to import orjson, fallback to stdlib json if not available
+try:
+    import orjson # type: ignore
+except ImportError:
+    orjson = None
+
+def _json_default(value: Any) -> Any:
+    """Serialize the non-JSON types stored payloads carry (provider prices, timestamps)"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def json_dumps(value: Any, default: Callable[[Any], Any] = _json_default,
+               sort_keys: bool = False, indent: bool = False) -> str:
+    """
+    Serialize to a compact JSON string, or indented by two spaces with indent,
+    using orjson when it is installed. Non-string dict keys are stringified
+    either way.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, default=default, option=option).decode()
+    if indent:
+        return json.dumps(value, default=default, sort_keys=sort_keys, indent=2)
+    return json.dumps(value, default=default, sort_keys=sort_keys, separators=(',', ':'))
+
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Names of the server-side prepared statements each live connection holds.
+# Keyed weakly so a reconnect starts from an empty set.
+_prepared_statements = weakref.WeakKeyDictionary()
+
+def decode_json_column(value: Any, default: Any) -> Any:
+    """
+    Read a JSON/JSONB column value. psycopg2 hands JSONB back already decoded,
+    so only string values (TEXT columns, legacy rows) are parsed.
+    """
+    if not value:
+        return default
+    return json_loads(value) if isinstance(value, (str, bytes)) else value
+
+def execute_prepared(cur, name: str, statement: str, params: tuple = ()):
+    """
+    Execute a named server-side prepared statement on the cursor's connection.
+    
+    The statement (written with $1..$n placeholders) is PREPAREd the first time the
+    connection sees that name, and every call then runs EXECUTE so PostgreSQL skips
+    parsing and planning.
+    """
+    prepared = _prepared_statements.setdefault(cur.connection, set())
+    if name not in prepared:
+        cur.execute(f"PREPARE {name} AS {statement}")
+        prepared.add(name)
+    
+    if params:
+        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cur.execute(f"EXECUTE {name}")
 
 class StorageService:
     def __init__(self):
         self.db_url = os.getenv("DATABASE_URL")
+        self.pool_min = int(os.getenv("DB_POOL_MIN", "1"))
+        self.pool_max = int(os.getenv("DB_POOL_MAX", "10"))
         self.conn = None
+        self.pool = None
         self._connect_db()
 
     def _connect_db(self):
@@ -20,4 +96,44 @@ class StorageService:
         except Exception as e:
             print(f"Error connecting to database: {e}")
             self.conn = None
+            return
+
+        # JSONB columns come back already decoded on this and every pooled connection
+        register_default_jsonb(globally=True, loads=json_loads)
+
+        try:
+            self.pool = ThreadedConnectionPool(self.pool_min, self.pool_max, self.db_url)
+        except Exception as e:
+            print(f"Error creating database connection pool: {e}")
+            self.pool = None
+
+    @contextmanager
+    def get_conn(self):
+        """
+        Check out an autocommit connection for the duration of the block.
+        
+        Falls back to the shared connection when no pool is available. A
+        connection that broke inside the block is discarded instead of being
+        returned to the pool.
+        """
+        if not self.pool:
+            yield self.conn
+            return
+
+        conn = self.pool.getconn()
+        conn.autocommit = True
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.pool.putconn(conn, close=bool(conn.closed))
+
+    @contextmanager
+    def cursor(self):
+        """Open a cursor on a checked-out connection for the duration of the block."""
+        with self.get_conn() as conn, conn.cursor() as cur:
+            yield cur
 
@@ -83,7 +83,8 @@ class SchemaManager:
     
     def create_all_tables(self) -> bool:
         """
-        Create all tables and indexes in the correct dependency order
+        Create all tables, apply their migrations and create indexes in the
+        correct dependency order
         """
         if not self.storage.conn:
             print("❌ No database connection available")
@@ -115,7 +116,24 @@ class SchemaManager:
                 # Commit after all tables are created
                 self.storage.conn.commit()
                 
-                # Second pass: Create indexes (after all tables exist)
+                # Second pass: Bring tables created by older definitions up to date
+                # (before the indexes, which may rely on the migrated columns)
+                print("\n🔧 Applying migrations...")
+                for schema_name in creation_order:
+                    schema = self.schema_dependencies[schema_name]
+                    
+                    for migration_sql in schema.get_migrations():
+                        try:
+                            cur.execute(migration_sql)
+                        except Exception as e:
+                            print(f"  ❌ Migration error in {schema.__class__.__name__}: {e}")
+                            print(f"  SQL: {migration_sql.strip()[:200]}...")
+                            return False
+                
+                # Commit after migrations
+                self.storage.conn.commit()
+                
+                # Third pass: Create indexes (after all tables exist)
                 print("\n📊 Creating indexes...")
                 for schema_name in creation_order:
                     schema = self.schema_dependencies[schema_name]
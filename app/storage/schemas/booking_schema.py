@@ -1,6 +1,17 @@
 from typing import List
 from .base_schema import BaseSchema
 
+# Server-side booking reference: 8 uppercase hex characters
+BOOKING_REFERENCE_DEFAULT = "upper(substring(md5(random()::text || clock_timestamp()::text) for 8))"
+
+# Allowed booking_timeline.event_type values
+TIMELINE_EVENT_TYPES_SQL = """
+    'booking_created', 'booking_updated', 'booking_status_updated', 'booking_finalized',
+    'passenger_added', 'passenger_updated', 'emergency_contact_added', 'payment_initiated',
+    'payment_completed', 'payment_failed', 'booking_confirmed', 'check_in_completed',
+    'flight_status_updated', 'booking_cancelled', 'refund_processed', 'documents_generated'
+"""
+
 class BookingSchema(BaseSchema):
     """
     Booking system with support for group bookings and passenger connections
@@ -9,10 +20,10 @@ class BookingSchema(BaseSchema):
     def get_table_definitions(self) -> List[str]:
         return [
             # 1. First create the main bookings table
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS bookings (
                 id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                booking_reference VARCHAR(20) UNIQUE NOT NULL,
+                booking_reference VARCHAR(20) UNIQUE NOT NULL DEFAULT {BOOKING_REFERENCE_DEFAULT},
                 
                 -- WHO MADE THE BOOKING (provides contact info)
                 primary_user_id INT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
@@ -49,7 +60,7 @@ class BookingSchema(BaseSchema):
                 provider_name VARCHAR(50),                -- e.g. 'amadeus', 'sabre', 'airline_direct'
                 provider_booking_id VARCHAR(255),         -- external booking identifier
                 provider_pnr VARCHAR(20),                 -- PNR code if applicable
-                provider_response JSONB DEFAULT '{}',     -- raw API response
+                provider_response JSONB DEFAULT '{{}}',     -- raw API response
                 
                 -- Booking-level services and requests
                 travel_insurance BOOLEAN DEFAULT FALSE,
@@ -170,7 +181,7 @@ class BookingSchema(BaseSchema):
             """,
             
             # 4. Finally create booking_timeline
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS booking_timeline (
                 id SERIAL PRIMARY KEY,
                 booking_id UUID NOT NULL REFERENCES bookings(id) ON DELETE CASCADE,
@@ -178,7 +189,7 @@ class BookingSchema(BaseSchema):
                 -- Event Details
                 event_type VARCHAR(50) NOT NULL,
                 event_description TEXT,
-                event_data JSONB DEFAULT '{}',
+                event_data JSONB DEFAULT '{{}}',
                 
                 -- Event Context
                 triggered_by_user_id INT REFERENCES users(id) ON DELETE CASCADE,
@@ -188,11 +199,7 @@ class BookingSchema(BaseSchema):
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 
                 -- Constraints
-                CONSTRAINT valid_event_type CHECK (event_type IN (
-                    'booking_created', 'passenger_added', 'passenger_updated', 'payment_initiated',
-                    'payment_completed', 'payment_failed', 'booking_confirmed', 'check_in_completed',
-                    'flight_status_updated', 'booking_cancelled', 'refund_processed', 'documents_generated'
-                ))
+                CONSTRAINT valid_event_type CHECK (event_type IN ({TIMELINE_EVENT_TYPES_SQL}))
             );
             """
         ]
@@ -205,9 +212,22 @@ class BookingSchema(BaseSchema):
             "CREATE INDEX IF NOT EXISTS idx_bookings_departure ON bookings(departure_date);",
             "CREATE INDEX IF NOT EXISTS idx_bookings_provider_pnr ON bookings(provider_pnr);",
             "CREATE INDEX IF NOT EXISTS idx_bookings_provider_id ON bookings(provider_booking_id);",
+            # Ownership lookups, and the passenger lookups' join to a user's bookings
+            # (which reads created_at), are index-only scans
+            "CREATE INDEX IF NOT EXISTS idx_bookings_id_user_created ON bookings(id, primary_user_id) INCLUDE (created_at);",
+            # Booking listings read a user's newest bookings first with a LIMIT
+            "CREATE INDEX IF NOT EXISTS idx_bookings_user_created ON bookings(primary_user_id, created_at DESC);",
+            # Backs get_bookings_for_user's status / departure filters
+            "CREATE INDEX IF NOT EXISTS idx_bookings_user_status_departure ON bookings(primary_user_id, booking_status, departure_date);",
+            # Upcoming-trips lookups (departure_date >= today) without a status filter
+            "CREATE INDEX IF NOT EXISTS idx_bookings_user_future ON bookings(primary_user_id, departure_date DESC) WHERE departure_date IS NOT NULL;",
+            # Partial index for per-user cancellation history (kept small by the predicate)
+            "CREATE INDEX IF NOT EXISTS idx_bookings_user_cancelled ON bookings(primary_user_id, cancelled_at DESC) WHERE booking_status = 'cancelled';",
             
             "CREATE INDEX IF NOT EXISTS idx_booking_passengers_booking ON booking_passengers(booking_id);",
             "CREATE INDEX IF NOT EXISTS idx_booking_passengers_profile ON booking_passengers(passenger_profile_id);",
+            # Passenger lookups count a profile's bookings without touching the heap
+            "CREATE INDEX IF NOT EXISTS idx_booking_passengers_profile_booking ON booking_passengers(passenger_profile_id, booking_id) INCLUDE (id);",
             "CREATE INDEX IF NOT EXISTS idx_booking_passengers_sequence ON booking_passengers(booking_id, passenger_sequence);",
             
             "CREATE INDEX IF NOT EXISTS idx_booking_segments_booking ON booking_flight_segments(booking_id);",
@@ -216,4 +236,23 @@ class BookingSchema(BaseSchema):
             
             "CREATE INDEX IF NOT EXISTS idx_booking_timeline_booking ON booking_timeline(booking_id, created_at DESC);",
             "CREATE INDEX IF NOT EXISTS idx_booking_timeline_event ON booking_timeline(event_type);",
+            "CREATE INDEX IF NOT EXISTS idx_booking_timeline_booking_event ON booking_timeline(booking_id, event_type, created_at DESC);",
+        ]
+    
+    def get_migrations(self) -> List[str]:
+        """Bring existing booking tables up to date"""
+        return [
+            f"""
+            ALTER TABLE bookings 
+            ALTER COLUMN booking_reference SET DEFAULT {BOOKING_REFERENCE_DEFAULT};
+            """,
+            
+            f"""
+            ALTER TABLE booking_timeline 
+            DROP CONSTRAINT IF EXISTS valid_event_type,
+            ADD CONSTRAINT valid_event_type CHECK (event_type IN ({TIMELINE_EVENT_TYPES_SQL}));
+            """,
+            
+            # Superseded by idx_bookings_id_user_created
+            "DROP INDEX IF EXISTS idx_bookings_id_user;",
         ]
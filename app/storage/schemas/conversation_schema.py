@@ -328,9 +328,10 @@ class ConversationSchema(BaseSchema):
             ADD COLUMN IF NOT EXISTS ai_confidence_score DECIMAL(3,2) DEFAULT 0.00;
             """,
             
-            # Example migration for new constraints
+            # Example migration for new constraints; dropped first so it can be re-run
             """
             ALTER TABLE conversations 
+            DROP CONSTRAINT IF EXISTS valid_mood,
             ADD CONSTRAINT valid_mood CHECK (conversation_mood IS NULL OR conversation_mood IN (
                 'positive', 'neutral', 'negative', 'frustrated', 'excited', 'confused'
             ));
@@ -128,6 +128,12 @@ class PassengerSchema(BaseSchema):
             "CREATE INDEX IF NOT EXISTS idx_passenger_profiles_document ON passenger_profiles(primary_document_number);",
             "CREATE INDEX IF NOT EXISTS idx_passenger_profiles_last_used ON passenger_profiles(last_used_at);",
             
+            # Trigram indexes back the ILIKE name lookups, including '%name%' patterns
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            "CREATE INDEX IF NOT EXISTS idx_passenger_profiles_first_name_trgm ON passenger_profiles USING gin (first_name gin_trgm_ops);",
+            "CREATE INDEX IF NOT EXISTS idx_passenger_profiles_last_name_trgm ON passenger_profiles USING gin (last_name gin_trgm_ops);",
+            "CREATE INDEX IF NOT EXISTS idx_passenger_profiles_full_name_trgm ON passenger_profiles USING gin ((first_name || ' ' || last_name) gin_trgm_ops);",
+            
             "CREATE INDEX IF NOT EXISTS idx_booking_passengers_booking ON booking_passengers(booking_id);",
             "CREATE INDEX IF NOT EXISTS idx_booking_passengers_profile ON booking_passengers(passenger_profile_id);",
             "CREATE INDEX IF NOT EXISTS idx_booking_passengers_sequence ON booking_passengers(booking_id, passenger_sequence);",
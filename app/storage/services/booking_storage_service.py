@@ -1,20 +1,489 @@
 # ==============================================================================
 # app/storage/services/booking_storage_service.py
 # ==============================================================================
-from typing import Dict, Any, List, Optional, Tuple
-import json
-import random
-import string
+from typing import Dict, Any, Callable, List, Optional, Tuple
+import hashlib
+import logging
+from itertools import product
 from dataclasses import dataclass
 from datetime import datetime, date
 from decimal import Decimal
-from app.storage.db_service import StorageService
+from types import MappingProxyType
+from psycopg2.extras import Json, execute_values
+from app.storage.db_service import StorageService, execute_prepared, json_dumps
 from app.storage.services.shared_storage import SharedStorageService
 from app.services.api.flights.response_models import Passenger, PassengerType
 from app.services.api.flights.flight_service import FlightService
 from app.storage.services.passenger_storage_service import PassengerProfile
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Coerce a timestamp column value (datetime, or ISO string inside JSON) to a datetime"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+def _jsonb(value: Any) -> Json:
+    """Wrap a value so psycopg2 adapts it as a JSONB parameter"""
+    return Json(value, dumps=json_dumps)
+
+# Maximum INSERT attempts when a generated booking reference collides
+BOOKING_REFERENCE_ATTEMPTS = 3
+
+# JSONB bookings columns; decoded values are bound through the orjson adapter
+# and pre-serialized strings are passed through for the server to parse
+_BOOKING_JSONB_COLUMNS = frozenset({'selected_flight_offers', 'provider_response'})
+
+def _bind_booking_value(column: str, value: Any) -> Any:
+    """Adapt a bookings column value for binding"""
+    if column in _BOOKING_JSONB_COLUMNS and isinstance(value, (list, dict)):
+        return _jsonb(value)
+    return value
+
+# Insertable bookings columns; columns a caller omits take their schema defaults
+_BOOKING_INSERT_COLUMNS = (
+    'booking_reference', 'primary_user_id', 'group_size', 'booking_type',
+    'search_id', 'selected_flight_offers', 'trip_type', 'origin_airport',
+    'destination_airport', 'departure_date', 'return_date', 'base_price',
+    'taxes_and_fees', 'service_fee', 'insurance_fee', 'total_amount', 'currency',
+    'booking_status', 'payment_status', 'fulfillment_status', 'provider_name',
+    'provider_booking_id', 'provider_pnr', 'provider_response', 'travel_insurance',
+    'special_requests', 'accessibility_requirements', 'emergency_contact_name',
+    'emergency_contact_phone', 'emergency_contact_relationship',
+    'emergency_contact_email', 'confirmation_deadline', 'payment_deadline',
+    'checkin_available_at', 'confirmed_at', 'cancelled_at',
+)
+_BOOKING_INSERT_COLUMN_SET = frozenset(_BOOKING_INSERT_COLUMNS)
+
+# Prepared INSERT statements, one per distinct set of supplied columns:
+# (columns in _BOOKING_INSERT_COLUMNS order) -> (statement name, statement)
+_CREATE_BOOKING_STATEMENTS: Dict[Tuple[str, ...], Tuple[str, str]] = {}
+
+def _create_booking_statement(columns: Tuple[str, ...]) -> Tuple[str, str]:
+    """
+    Return the prepared statement name and SQL that inserts a booking with the
+    given columns together with its creation event; a reference collision
+    inserts nothing and returns no row. Without a booking_reference column the
+    column default draws one.
+    """
+    if columns not in _CREATE_BOOKING_STATEMENTS:
+        placeholders = ', '.join(f'${i}' for i in range(1, len(columns) + 1))
+        statement = f"""
+            WITH new_booking AS (
+                INSERT INTO bookings ({', '.join(columns)})
+                VALUES ({placeholders})
+                ON CONFLICT (booking_reference) DO NOTHING
+                RETURNING id, primary_user_id
+            ), created_event AS (
+                INSERT INTO booking_timeline (
+                    booking_id, event_type, event_description, event_data,
+                    triggered_by_user_id, system_event
+                )
+                SELECT id, 'booking_created', 'Booking created', '{{}}', primary_user_id, FALSE
+                FROM new_booking
+            )
+            SELECT id FROM new_booking;
+        """
+        name = f"create_booking_{hashlib.sha1(repr(columns).encode()).hexdigest()[:16]}"
+        _CREATE_BOOKING_STATEMENTS[columns] = (name, statement)
+    return _CREATE_BOOKING_STATEMENTS[columns]
+
+# Prepared UPDATE statements, one per distinct set of updated fields:
+# (sorted field names, owner checked, unchanged skipped, with event) -> (statement name, statement).
+# The name is derived from the key, so threads racing to build the same entry agree on it.
+_UPDATE_BOOKING_STATEMENTS: Dict[Tuple[Tuple[str, ...], bool, bool, bool], Tuple[str, str]] = {}
+
+def _update_booking_statement(fields: Tuple[str, ...], check_owner: bool = False,
+                              skip_unchanged: bool = False, with_event: bool = False) -> Tuple[str, str]:
+    """
+    Return the prepared statement name and SQL that updates the given booking fields.
+    With with_event, the five _timeline_row values after booking_id are bound last
+    and the event is inserted for an updated row in the same statement.
+    """
+    key = (fields, check_owner, skip_unchanged, with_event)
+    if key not in _UPDATE_BOOKING_STATEMENTS:
+        assignments = ', '.join(f"{field} = ${i}" for i, field in enumerate(fields, start=1))
+        owner_predicate = f" AND primary_user_id = ${len(fields) + 2}" if check_owner else ""
+        # Rows whose values already match are left alone, so rowcount is 0
+        changed_predicate = (
+            " AND (" + " OR ".join(f"{field} IS DISTINCT FROM ${i}" for i, field in enumerate(fields, start=1)) + ")"
+            if skip_unchanged else ""
+        )
+        statement = f"""
+                UPDATE bookings
+                SET {assignments}, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ${len(fields) + 1}{owner_predicate}{changed_predicate}
+            """
+        if with_event:
+            # rowcount is the number of updated bookings, each with its event
+            e = len(fields) + (3 if check_owner else 2)
+            statement = f"""
+                WITH updated AS ({statement}RETURNING id
+                ), updated_event AS (
+                    INSERT INTO booking_timeline (
+                        booking_id, event_type, event_description, event_data,
+                        triggered_by_user_id, system_event
+                    )
+                    SELECT id, ${e}, ${e + 1}, COALESCE(${e + 2}, '{{}}'::jsonb), ${e + 3}, ${e + 4}
+                    FROM updated
+                )
+                SELECT id FROM updated
+            """
+        name = f"update_booking_{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}"
+        _UPDATE_BOOKING_STATEMENTS[key] = (name, statement)
+    return _UPDATE_BOOKING_STATEMENTS[key]
+
+# Change the status and record it on the timeline in one statement; no
+# event is written when the booking does not exist
+_UPDATE_BOOKING_STATUS_SQL = """
+    WITH updated AS (
+        UPDATE bookings
+        SET booking_status = $1, updated_at = CURRENT_TIMESTAMP
+        WHERE id = $2
+        RETURNING id
+    )
+    INSERT INTO booking_timeline (
+        booking_id, event_type, event_description, event_data,
+        triggered_by_user_id, system_event
+    )
+    SELECT id, 'booking_status_updated', 'Status changed to ' || $1,
+           jsonb_build_object('new_status', $1::varchar), $3, FALSE
+    FROM updated
+"""
+
+_TIMELINE_INSERT_SQL = """
+    INSERT INTO booking_timeline (
+        booking_id, event_type, event_description, event_data,
+        triggered_by_user_id, system_event
+    ) VALUES %s
+"""
+# Events without data are bound as NULL and stored as an empty object
+_TIMELINE_ROW_TEMPLATE = "(%s, %s, %s, COALESCE(%s, '{}'::jsonb), %s, %s)"
+
+def _timeline_row(booking_id: str, event_type: str, event_description: Optional[str] = None,
+                  event_data: Optional[Dict[str, Any]] = None, triggered_by_user_id: Optional[int] = None,
+                  system_event: bool = False) -> tuple:
+    """Build a booking_timeline row for _TIMELINE_ROW_TEMPLATE"""
+    return (
+        booking_id, event_type, event_description,
+        _jsonb(event_data) if event_data else None, triggered_by_user_id, system_event
+    )
+
+# Read statements, executed as server-side prepared statements ($n placeholders).
+# Each column tuple follows its dataclass's field order, so rows are passed
+# to the constructors positionally.
+_BOOKING_COLUMNS: Tuple[str, ...] = (
+    'id', 'booking_reference', 'primary_user_id', 'group_size', 'booking_type',
+    'search_id', 'selected_flight_offers', 'trip_type', 'origin_airport',
+    'destination_airport', 'departure_date', 'return_date', 'base_price',
+    'taxes_and_fees', 'service_fee', 'insurance_fee', 'total_amount', 'currency',
+    'booking_status', 'payment_status', 'fulfillment_status',
+    'provider_name', 'provider_booking_id', 'provider_pnr', 'provider_response',
+    'travel_insurance', 'special_requests', 'accessibility_requirements',
+    'emergency_contact_name', 'emergency_contact_phone',
+    'emergency_contact_relationship', 'emergency_contact_email',
+    'confirmation_deadline', 'payment_deadline', 'checkin_available_at',
+    'created_at', 'updated_at', 'confirmed_at', 'cancelled_at',
+)
+_SEGMENT_COLUMNS: Tuple[str, ...] = (
+    'id', 'booking_id', 'flight_offer_id', 'segment_sequence', 'segment_type',
+    'airline_code', 'airline_name', 'flight_number', 'aircraft_type',
+    'departure_airport', 'departure_terminal', 'departure_time',
+    'arrival_airport', 'arrival_terminal', 'arrival_time', 'duration_minutes',
+    'distance_km', 'flight_status', 'actual_departure_time',
+    'actual_arrival_time', 'delay_minutes', 'gate_info', 'created_at', 'updated_at',
+)
+_TIMELINE_COLUMNS: Tuple[str, ...] = (
+    'id', 'booking_id', 'event_type', 'event_description', 'event_data',
+    'triggered_by_user_id', 'system_event', 'created_at',
+)
+
+# JSONB columns read with an empty default for NULL, so rows need no fixing
+# up before they reach the dataclass constructors
+_JSONB_READ_DEFAULTS = {'selected_flight_offers': '[]', 'provider_response': '{}', 'event_data': '{}'}
+
+def _select_list(columns: Tuple[str, ...]) -> str:
+    """Select list for a column tuple, with _JSONB_READ_DEFAULTS applied"""
+    return ', '.join(
+        f"COALESCE(NULLIF({column}, 'null'::jsonb), '{_JSONB_READ_DEFAULTS[column]}'::jsonb) AS {column}"
+        if column in _JSONB_READ_DEFAULTS else column
+        for column in columns
+    )
+
+_BOOKING_SELECT_LIST = _select_list(_BOOKING_COLUMNS)
+_GET_BOOKING_SQL = f"SELECT {_BOOKING_SELECT_LIST} FROM bookings WHERE id = $1"
+_GET_BOOKING_WITH_COUNTS_SQL = f"""
+    SELECT {_BOOKING_SELECT_LIST}, passengers.passenger_count
+    FROM bookings
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) AS passenger_count FROM booking_passengers bp WHERE bp.booking_id = bookings.id
+    ) passengers ON TRUE
+    WHERE id = $1
+"""
+_GET_BOOKING_FOR_USER_WITH_COUNTS_SQL = f"{_GET_BOOKING_WITH_COUNTS_SQL.rstrip()} AND primary_user_id = $2"
+# Fixed per-operation lines of the tool result context; placeholders are
+# filled from the tool result
+_OPERATION_CONTEXT_TEMPLATES = {
+    'create': "SUCCESS: Booking created\nBooking ID: {booking_id}\nAmount: ${total_amount}\nStatus: Draft - needs passengers\n",
+    'add_passenger': "SUCCESS: Passenger added\nAdded: {first_name} {last_name}\nProgress: {total}/{required} passengers\n",
+    'update_passenger': "SUCCESS: Passenger details updated\n",
+    'update_booking': "SUCCESS: Booking updated\n",
+    'add_emergency_contact': "SUCCESS: Emergency contact added\n",
+    'finalize': "SUCCESS: Booking finalized\n",
+}
+# The offer entry a booking's selected_flight_offers stands for, per value
+# type: a list (as decoded from JSONB) by its first entry, a bare string by itself
+_SELECTED_OFFER_ENTRY: Dict[type, Callable[[Any], Any]] = {
+    list: lambda offers: offers[0],
+    str: lambda offers: offers,
+}
+# Offer ID extraction per selected offer entry type; dicts are searched for
+# the common ID fields
+_OFFER_ID_EXTRACTORS: Dict[type, Callable[[Any], Any]] = {
+    str: lambda offer: offer,
+    dict: lambda offer: offer.get('id') or offer.get('offer_id') or offer.get('flight_offer_id'),
+}
+
+# Fields the booking-level tool handlers accept
+_BOOKING_UPDATE_FIELDS = frozenset({'group_size', 'booking_type', 'special_requests', 'accessibility_requirements'})
+_EMERGENCY_CONTACT_FIELDS = frozenset({
+    'emergency_contact_name', 'emergency_contact_phone',
+    'emergency_contact_relationship', 'emergency_contact_email',
+})
+
+# Tool call representation per booking operation, built from (result, kwargs, booking_id)
+_TOOL_CALL_BUILDERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any], str], str]] = {
+    'create': lambda r, k, b: (
+        f"<call>create_flight_booking(search_id='{r.get('search_id', k.get('search_id', ''))}', "
+        f"flight_offer_ids={k.get('flight_offer_ids', [])})</call>"
+    ),
+    'add_passenger': lambda r, k, b: (
+        f"<call>manage_booking_passengers(booking_id='{b}', action='add', "
+        f"first_name='{r.get('first_name', k.get('first_name', ''))}', "
+        f"last_name='{r.get('last_name', k.get('last_name', ''))}', ...)</call>"
+    ),
+    'update_passenger': lambda r, k, b: (
+        f"<call>manage_booking_passengers(booking_id='{b}', action='update', "
+        f"passenger_id='{r.get('passenger_id', k.get('passenger_id', ''))}', ...)</call>"
+    ),
+    'update_booking': lambda r, k, b: f"<call>manage_booking_passengers(booking_id='{b}', action='update_booking', ...)</call>",
+    'get': lambda r, k, b: f"<call>manage_booking_passengers(booking_id='{b}', action='get')</call>",
+    'add_emergency_contact': lambda r, k, b: f"<call>manage_booking_passengers(booking_id='{b}', action='add_emergency_contact', ...)</call>",
+    'finalize': lambda r, k, b: f"<call>finalize_booking(booking_id='{b}')</call>",
+}
+
+# Booking summary progress markers, keyed by whether the step is complete
+_PROGRESS_GLYPH = {True: "✓", False: "⚠"}
+_DETAILS_PROGRESS = {True: "✓ Details complete", False: "⚠ Details incomplete"}
+_EMERGENCY_CONTACT_PROGRESS = {True: "✓ Emergency contact", False: "⚠ Emergency contact needed"}
+_BOOKING_STATUS_HEADER = "\n" + "=" * 50 + "\nCURRENT BOOKING STATUS:\n"
+_PASSENGER_MISSING_LABELS = (
+    ('date_of_birth', 'DOB missing'),
+    ('nationality', 'nationality missing'),
+    ('document_number', 'passport missing'),
+    ('seat_preference', 'seat pref missing'),
+    ('meal_preference', 'meal pref missing'),
+)
+
+# Finalization reads the owned booking, its passenger count and the passenger
+# fields the provider needs in one round trip
+# Provider defaults for missing values are applied here, and dates are cast
+# to timestamp so the driver hands back datetime directly
+_PROVIDER_PASSENGER_COLUMNS = (
+    "COALESCE(first_name, '')", "COALESCE(last_name, '')",
+    "COALESCE(date_of_birth, DATE '1990-01-01')::timestamp",
+    "COALESCE(NULLIF(gender, ''), 'M')", "COALESCE(NULLIF(nationality, ''), 'US')",
+    'passport_number', 'document_expiry::timestamp', 'seat_preference', 'meal_preference',
+)
+_GET_FINALIZE_SNAPSHOT_SQL = f"""
+    SELECT {_BOOKING_SELECT_LIST}, passengers.passenger_count, passengers.passenger_rows
+    FROM bookings
+    LEFT JOIN LATERAL (
+        SELECT COUNT(*) AS passenger_count,
+               COALESCE(jsonb_agg(jsonb_build_array({', '.join(_PROVIDER_PASSENGER_COLUMNS)})
+                                  ORDER BY bp.created_at), '[]'::jsonb) AS passenger_rows
+        FROM booking_passengers bp WHERE bp.booking_id = bookings.id
+    ) passengers ON TRUE
+    WHERE id = $1 AND primary_user_id = $2
+"""
+_GET_PROVIDER_PASSENGERS_SQL = f"""
+    SELECT {', '.join(_PROVIDER_PASSENGER_COLUMNS)}
+    FROM booking_passengers
+    WHERE booking_id = $1
+    ORDER BY created_at
+"""
+_GET_BOOKING_OWNER_SQL = "SELECT primary_user_id FROM bookings WHERE id = $1"
+_GET_CANCELLATION_SNAPSHOT_SQL = """
+    SELECT primary_user_id, booking_reference, booking_status, payment_status,
+        provider_name, provider_booking_id, provider_pnr, total_amount, currency
+    FROM bookings WHERE id = $1
+"""
+# Cancel the booking and record it on the timeline in one statement
+_CANCEL_BOOKING_SQL = """
+    WITH cancelled AS (
+        UPDATE bookings
+        SET booking_status = 'cancelled', cancelled_at = CURRENT_TIMESTAMP,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = $1
+        RETURNING id, cancelled_at
+    ), cancelled_event AS (
+        INSERT INTO booking_timeline (
+            booking_id, event_type, event_description, event_data,
+            triggered_by_user_id, system_event
+        )
+        SELECT id, 'booking_cancelled', $2, $3, $4, FALSE
+        FROM cancelled
+    )
+    SELECT cancelled_at FROM cancelled
+"""
+_GET_BOOKINGS_FOR_USER_SQL = f"""
+    SELECT {_BOOKING_SELECT_LIST}
+    FROM bookings 
+    WHERE primary_user_id = $1
+      AND ($4::varchar IS NULL OR booking_status = $4)
+      AND ($5::date IS NULL OR departure_date >= $5)
+    ORDER BY created_at DESC 
+    LIMIT $2 OFFSET $3
+"""
+_GET_USER_BOOKING_SUMMARIES_SQL = """
+    SELECT id, booking_reference, booking_status, origin_airport, destination_airport,
+           departure_date, total_amount, currency, provider_pnr
+    FROM bookings 
+    WHERE primary_user_id = $1
+      AND ($3::varchar IS NULL OR booking_status = $3)
+      AND ($4::boolean OR departure_date >= CURRENT_DATE)
+    ORDER BY created_at DESC 
+    LIMIT $2
+"""
+_GET_SEGMENTS_SQL = f"""
+    SELECT {', '.join(_SEGMENT_COLUMNS)}
+    FROM booking_flight_segments 
+    WHERE booking_id = $1 
+    ORDER BY segment_sequence
+"""
+_GET_TIMELINE_SQL = f"""
+    SELECT {_select_list(_TIMELINE_COLUMNS)}
+    FROM booking_timeline 
+    WHERE booking_id = $1 
+    ORDER BY created_at DESC
+    LIMIT $2 OFFSET $3
+"""
+
+# PassengerProfile fields in dataclass order, read from passenger_profiles pp.
+# The lookups' defaults for missing values are applied in SQL, so the leading
+# _PASSENGER_PROFILE_WIDTH values of a row construct the profile positionally
+_PASSENGER_PROFILE_READ_DEFAULTS = {
+    'first_name': "COALESCE(pp.first_name, '')",
+    'last_name': "COALESCE(pp.last_name, '')",
+    'seat_preference': "COALESCE(NULLIF(pp.seat_preference, ''), 'any')",
+    'airline_loyalties': "COALESCE(NULLIF(pp.airline_loyalties, 'null'::jsonb), '{}'::jsonb)",
+    'is_verified': "COALESCE(pp.is_verified, FALSE)",
+}
+_PASSENGER_PROFILE_WIDTH = len(PassengerProfile.__dataclass_fields__)
+_PASSENGER_PROFILE_SELECT_LIST = ', '.join(
+    _PASSENGER_PROFILE_READ_DEFAULTS.get(field, f"pp.{field}")
+    for field in PassengerProfile.__dataclass_fields__
+)
+
+def _passenger_lookup_sql(by_booking: bool, by_first_name: bool, by_last_name: bool,
+                          own_only: bool) -> str:
+    """
+    Passenger lookup SQL for one combination of filters. $1 is the user and $2
+    the limit; the booking id and name patterns that apply follow in that order.
+    """
+    conditions = []
+    params = iter(range(3, 6))
+    if by_booking:
+        conditions.append(f"b.id = ${next(params)}")
+    if by_first_name:
+        conditions.append(f"pp.first_name ILIKE ${next(params)}")
+    if by_last_name:
+        conditions.append(f"pp.last_name ILIKE ${next(params)}")
+    # Without connections, only profiles created by this user are included
+    if own_only:
+        conditions.append("pp.created_by_user_id = $1")
+    filters = "".join(f" AND {condition}" for condition in conditions)
+    # Grouping by the profile's primary key already yields one row per profile
+    # and connection, so no DISTINCT pass is needed on top
+    return f"""
+        SELECT
+            {_PASSENGER_PROFILE_SELECT_LIST},
+            upc.relationship,
+            upc.connection_type,
+            upc.trust_level,
+            upc.can_book_for_passenger,
+            upc.can_modify_passenger_details,
+            upc.can_view_passenger_history,
+            COUNT(bp.id) as booking_count,
+            MAX(b.created_at) as last_booking_date
+        FROM passenger_profiles pp
+        LEFT JOIN user_passenger_connections upc ON pp.id = upc.passenger_id AND upc.user_id = $1
+        LEFT JOIN booking_passengers bp ON pp.id = bp.passenger_profile_id
+        LEFT JOIN bookings b ON bp.booking_id = b.id AND b.primary_user_id = $1
+        WHERE (
+            pp.created_by_user_id = $1
+            OR upc.user_id = $1
+        ){filters}
+        GROUP BY pp.id, upc.relationship, upc.connection_type, upc.trust_level,
+                upc.can_book_for_passenger, upc.can_modify_passenger_details, 
+                upc.can_view_passenger_history
+        ORDER BY 
+            CASE 
+                WHEN pp.created_by_user_id = $1 THEN 1  -- Own profiles first
+                WHEN upc.relationship = 'self' THEN 2  -- Self connections next
+                WHEN upc.relationship IN ('spouse', 'partner', 'child', 'parent') THEN 3  -- Family next
+                WHEN upc.trust_level = 'high' THEN 4  -- High trust connections
+                ELSE 5
+            END,
+            booking_count DESC NULLS LAST,  -- Most frequently booked
+            pp.last_traveled_at DESC NULLS LAST,  -- Most recently traveled
+            last_booking_date DESC NULLS LAST  -- Most recent booking
+        LIMIT $2
+    """
+
+# Every lookup variant, prepared by name so each is parsed and planned once per
+# connection: (by booking, by first name, by last name, own only) -> (name, SQL)
+_PASSENGER_LOOKUP_STATEMENTS = {
+    key: (f"passenger_lookup_{i}", _passenger_lookup_sql(*key))
+    for i, key in enumerate(product((False, True), repeat=4))
+}
+
+# Fixed column layout for booking_flight_segments inserts (booking_id and
+# segment_sequence are always supplied by the service itself)
+_SEGMENT_INSERT_COLUMNS = (
+    'flight_offer_id', 'segment_type', 'airline_code', 'airline_name', 'flight_number',
+    'aircraft_type', 'departure_airport', 'departure_terminal', 'departure_time',
+    'arrival_airport', 'arrival_terminal', 'arrival_time', 'duration_minutes',
+    'distance_km', 'flight_status', 'actual_departure_time', 'actual_arrival_time',
+    'delay_minutes', 'gate_info'
+)
+# Column defaults from the schema, applied when a segment omits the field
+_SEGMENT_DEFAULTS = {'segment_type': 'outbound', 'flight_status': 'scheduled', 'delay_minutes': 0}
+_SEGMENT_INSERT_SQL = f"""
+    INSERT INTO booking_flight_segments (booking_id, segment_sequence, {', '.join(_SEGMENT_INSERT_COLUMNS)})
+    VALUES %s
+    RETURNING id;
+"""
+# Each row numbers itself after the booking's current last segment, so the
+# sequence lookup rides along in the INSERT; within one statement the
+# subquery does not see the rows being inserted
+_SEGMENT_ROW_TEMPLATE = (
+    "(%s, (SELECT COALESCE(MAX(segment_sequence), 0) FROM booking_flight_segments WHERE booking_id = %s) + %s, "
+    + ", ".join(["%s"] * len(_SEGMENT_INSERT_COLUMNS)) + ")"
+)
+
+# Precomputed cancellation messages and the static part of its result
+_CANCEL_EVENT_PREFIX = "Booking cancelled: "
+_CANCEL_SUCCESS_BASE = MappingProxyType({
+    'success': True,
+    'status': 'cancelled',
+    'message': 'Booking cancelled successfully'
+})
+
+@dataclass(slots=True, frozen=True)
 class Booking:
     id: str
     booking_reference: str
@@ -57,6 +526,35 @@ class Booking:
     cancelled_at: Optional[datetime]
 
 @dataclass
+class CancellationResult:
+    success: bool
+    booking_id: str
+    error: Optional[str] = None
+    steps: Optional[List[Dict[str, Any]]] = None
+    cancelled_at: Optional[str] = None
+    total_amount: float = 0.0
+    refund_amount: float = 0.0
+    currency: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the JSON-native dict returned by booking tool operations"""
+        if not self.success:
+            result = {"error": self.error}
+        else:
+            result = {
+                **_CANCEL_SUCCESS_BASE,
+                'booking_id': self.booking_id,
+                'cancelled_at': self.cancelled_at,
+                'total_amount': self.total_amount,
+                'refund_amount': self.refund_amount,
+                'currency': self.currency
+            }
+        
+        if self.steps is not None:
+            result['cancellation_steps'] = self.steps
+        return result
+
+@dataclass(slots=True, frozen=True)
 class BookingFlightSegment:
     id: str
     booking_id: str
@@ -83,7 +581,7 @@ class BookingFlightSegment:
     created_at: datetime
     updated_at: datetime
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BookingTimelineEvent:
     id: int
     booking_id: str
@@ -105,62 +603,56 @@ class BookingStorageService:
     - Provide booking context for model decisions
     """
     
+    # Tool action -> handler method name for handle_booking_operation
+    _OPERATION_HANDLERS = {
+        'create': '_handle_create_booking',
+        'get': '_handle_get_booking_context',
+        'update_booking': '_handle_update_booking',
+        'add_emergency_contact': '_handle_add_emergency_contact',
+        'finalize': '_handle_finalize_booking',
+        'cancel': '_handle_cancel_booking',
+    }
+    
     def __init__(self, storage: StorageService, shared_storage: Optional[SharedStorageService]=None):
         self.storage = storage
         self.shared_storage = shared_storage
+        # Injected by the service factory once the flight service exists
+        self.flight_service: Optional[FlightService] = None
     
     # ====================================================================
     # CORE BOOKING CRUD OPERATIONS
     # ====================================================================
     
     def create_booking(self, **booking_data) -> Optional[str]:
-        """Create a new booking and return booking ID"""
+        """Create a new booking together with its 'booking_created' timeline event"""
         if not self.storage.conn:
             return None
         
+        unknown_fields = booking_data.keys() - _BOOKING_INSERT_COLUMN_SET
+        if unknown_fields:
+            logger.error("Refusing to create booking with unknown fields %s", sorted(unknown_fields))
+            return None
+        
         try:
-            with self.storage.conn.cursor() as cur:
-                # Generate booking reference if not provided
-                if 'booking_reference' not in booking_data:
-                    booking_data['booking_reference'] = self._generate_booking_reference()
-                
-                # Handle JSON fields
-                if 'selected_flight_offers' in booking_data:
-                    if isinstance(booking_data['selected_flight_offers'], (list, dict)):
-                        booking_data['selected_flight_offers'] = json.dumps(booking_data['selected_flight_offers'])
-                
-                if 'provider_response' in booking_data:
-                    if isinstance(booking_data['provider_response'], dict):
-                        booking_data['provider_response'] = json.dumps(booking_data['provider_response'])
+            with self.storage.cursor() as cur:
+                # Only supplied columns are bound; callers passing the same
+                # columns share one prepared statement
+                columns = tuple(column for column in _BOOKING_INSERT_COLUMNS
+                                if column in booking_data
+                                and (column != 'booking_reference' or booking_data[column]))
+                values = tuple(_bind_booking_value(column, booking_data[column]) for column in columns)
+                name, statement = _create_booking_statement(columns)
                 
-                # Build insert query dynamically
-                fields = list(booking_data.keys())
-                placeholders = ', '.join(['%s'] * len(fields))
-                field_names = ', '.join(fields)
-                
-                insert_query = f"""
-                    INSERT INTO bookings ({field_names})
-                    VALUES ({placeholders})
-                    RETURNING id;
-                """
-                
-                cur.execute(insert_query, list(booking_data.values()))
-                result = cur.fetchone()
+                # A generated reference that collides inserts nothing, so the
+                # statement simply runs again with a fresh draw
+                attempts = 1 if 'booking_reference' in columns else BOOKING_REFERENCE_ATTEMPTS
+                for _ in range(attempts):
+                    execute_prepared(cur, name, statement, values)
+                    result = cur.fetchone()
+                    if result:
+                        return result[0]
                 
-                if result:
-                    booking_id = result[0]
-                    
-                    # Add timeline event
-                    self.add_timeline_event(
-                        booking_id=booking_id,
-                        event_type='booking_created',
-                        event_description='Booking created',
-                        triggered_by_user_id=booking_data.get('primary_user_id')
-                    )
-                    
-                    return booking_id
-                else:
-                    return None
+                return None
                 
         except Exception as e:
             print(f"Error creating booking: {e}")
@@ -172,109 +664,70 @@ class BookingStorageService:
             return None
         
         try:
-            with self.storage.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, booking_reference, primary_user_id, group_size, booking_type,
-                        search_id, selected_flight_offers, trip_type, origin_airport,
-                        destination_airport, departure_date, return_date, base_price,
-                        taxes_and_fees, service_fee, insurance_fee, total_amount, currency,
-                        booking_status, payment_status, fulfillment_status, 
-                        provider_name, provider_booking_id, provider_pnr, provider_response,
-                        travel_insurance, special_requests, accessibility_requirements,
-                        emergency_contact_name, emergency_contact_phone, 
-                        emergency_contact_relationship, emergency_contact_email,
-                        confirmation_deadline, payment_deadline, checkin_available_at,
-                        created_at, updated_at, confirmed_at, cancelled_at
-                    FROM bookings WHERE id = %s;
-                """, (booking_id,))
+            with self.storage.cursor() as cur:
+                execute_prepared(cur, 'get_booking_by_id', _GET_BOOKING_SQL, (booking_id,))
                 
                 row = cur.fetchone()
-                if row:
-                    return Booking(
-                        id=row[0], booking_reference=row[1], primary_user_id=row[2],
-                        group_size=row[3], booking_type=row[4], search_id=row[5],
-                        selected_flight_offers=self._safe_json_parse(row[6], []), # type: ignore
-                        trip_type=row[7], origin_airport=row[8], destination_airport=row[9],
-                        departure_date=row[10], return_date=row[11], base_price=row[12],
-                        taxes_and_fees=row[13], service_fee=row[14], insurance_fee=row[15],
-                        total_amount=row[16], currency=row[17], booking_status=row[18],
-                        payment_status=row[19], fulfillment_status=row[20],
-                        provider_name=row[21], provider_booking_id=row[22], 
-                        provider_pnr=row[23], provider_response=self._safe_json_parse(row[24], {}), # type: ignore
-                        travel_insurance=row[25], special_requests=row[26],
-                        accessibility_requirements=row[27], emergency_contact_name=row[28],
-                        emergency_contact_phone=row[29], emergency_contact_relationship=row[30],
-                        emergency_contact_email=row[31], confirmation_deadline=row[32],
-                        payment_deadline=row[33], checkin_available_at=row[34],
-                        created_at=row[35], updated_at=row[36], confirmed_at=row[37],
-                        cancelled_at=row[38]
-                    )
-                return None
+                return self._row_to_booking(row) if row else None
                 
         except Exception as e:
             print(f"Error getting booking: {e}")
             return None
     
-    def get_bookings_for_user(self, user_id: int, limit: int = 50, offset: int = 0) -> List[Booking]:
-        """Get bookings for a specific user"""
+    def get_bookings_for_user(self, user_id: int, limit: int = 50, offset: int = 0,
+                              status: Optional[str] = None,
+                              min_departure: Optional[date] = None) -> List[Booking]:
+        """Get bookings for a specific user, optionally filtered by status and earliest departure"""
         if not self.storage.conn:
             return []
         
         try:
-            with self.storage.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, booking_reference, primary_user_id, group_size, booking_type,
-                        search_id, selected_flight_offers, trip_type, origin_airport,
-                        destination_airport, departure_date, return_date, base_price,
-                        taxes_and_fees, service_fee, insurance_fee, total_amount, currency,
-                        booking_status, payment_status, fulfillment_status,
-                        provider_name, provider_booking_id, provider_pnr, provider_response,
-                        travel_insurance, special_requests, accessibility_requirements,
-                        emergency_contact_name, emergency_contact_phone,
-                        emergency_contact_relationship, emergency_contact_email,
-                        confirmation_deadline, payment_deadline, checkin_available_at,
-                        created_at, updated_at, confirmed_at, cancelled_at
-                    FROM bookings 
-                    WHERE primary_user_id = %s 
-                    ORDER BY created_at DESC 
-                    LIMIT %s OFFSET %s;
-                """, (user_id, limit, offset))
+            with self.storage.cursor() as cur:
+                execute_prepared(cur, 'get_bookings_for_user', _GET_BOOKINGS_FOR_USER_SQL,
+                                 (user_id, limit, offset, status, min_departure))
                 
-                return [self._row_to_booking(row) for row in cur.fetchall()]
+                return [self._row_to_booking(row) for row in cur]
                 
         except Exception as e:
             print(f"Error getting user bookings: {e}")
             return []
     
-    def update_booking(self, booking_id: str, update_data: Dict[str, Any]) -> bool:
-        """Update booking with arbitrary fields"""
+    def update_booking(self, booking_id: str, update_data: Dict[str, Any],
+                       user_id: Optional[int] = None, skip_unchanged: bool = False,
+                       timeline_event: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Update booking with arbitrary fields, only if owned by user_id when given.
+        With skip_unchanged, a booking that already holds these values is not
+        written and False is returned. A timeline_event (add_timeline_event
+        keyword arguments) is recorded by the same statement when a row changes.
+        """
         if not self.storage.conn:
             return False
         
+        if not update_data:
+            return False
+        
+        unknown_fields = update_data.keys() - _BOOKING_INSERT_COLUMN_SET
+        if unknown_fields:
+            logger.error("Refusing to update booking %s with unknown fields %s", booking_id, sorted(unknown_fields))
+            return False
+        
         try:
-            with self.storage.conn.cursor() as cur:
-                # Build update query dynamically
-                update_fields = []
-                update_values = []
-                
-                for field, value in update_data.items():
-                    if field in ['provider_response', 'selected_flight_offers'] and isinstance(value, dict):
-                        update_fields.append(f"{field} = %s")
-                        update_values.append(json.dumps(value))
-                    else:
-                        update_fields.append(f"{field} = %s")
-                        update_values.append(value)
-                
-                if not update_fields:
-                    return False
+            with self.storage.cursor() as cur:
+                # Callers passing the same fields share one prepared statement
+                fields = tuple(sorted(update_data))
+                update_values = [_bind_booking_value(field, update_data[field]) for field in fields]
                 
                 update_values.append(booking_id)
+                if user_id is not None:
+                    update_values.append(user_id)
+                if timeline_event:
+                    update_values.extend(_timeline_row(booking_id, **timeline_event)[1:])
                 
-                cur.execute(f"""
-                    UPDATE bookings 
-                    SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s;
-                """, update_values)
+                name, statement = _update_booking_statement(fields, check_owner=user_id is not None,
+                                                            skip_unchanged=skip_unchanged,
+                                                            with_event=bool(timeline_event))
+                execute_prepared(cur, name, statement, tuple(update_values))
                 
                 return cur.rowcount > 0
                 
@@ -282,6 +735,45 @@ class BookingStorageService:
             print(f"Error updating booking: {e}")
             return False
     
+    def update_booking_if_owner(self, booking_id: str, user_id: int, update_data: Dict[str, Any],
+                                failure_message: str = "Failed to update booking",
+                                skip_unchanged: bool = False,
+                                timeline_event: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Update a booking in one statement only if user_id owns it, recording its
+        timeline_event in that same statement when given. Returns None on success, otherwise the
+        response explaining why nothing was updated: an error, or with
+        skip_unchanged a no-op success when the values already match.
+        """
+        if self.update_booking(booking_id, update_data, user_id=user_id, skip_unchanged=skip_unchanged,
+                               timeline_event=timeline_event):
+            return None
+        
+        # Only a failed update pays for the lookup that explains why
+        access_error = self._access_error(booking_id, user_id)
+        if access_error:
+            return access_error
+        if skip_unchanged:
+            return {
+                'success': True,
+                'booking_id': booking_id,
+                'updated_fields': [],
+                'message': 'No changes detected'
+            }
+        return {"error": failure_message}
+    
+    def _access_error(self, booking_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """Explain why user_id cannot act on a booking, or None if they own it"""
+        with self.storage.cursor() as cur:
+            execute_prepared(cur, 'get_booking_owner', _GET_BOOKING_OWNER_SQL, (booking_id,))
+            row = cur.fetchone()
+        
+        if not row:
+            return {"error": "Booking not found"}
+        if row[0] != user_id:
+            return {"error": "Access denied to this booking"}
+        return None
+    
     def update_booking_status(self, booking_id: str, status: str, 
                             triggered_by_user_id: Optional[int] = None) -> bool:
         """Update booking status and add timeline event"""
@@ -289,43 +781,140 @@ class BookingStorageService:
             return False
         
         try:
-            with self.storage.conn.cursor() as cur:
-                cur.execute("""
-                    UPDATE bookings 
-                    SET booking_status = %s, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s;
-                """, (status, booking_id))
-                
-                if cur.rowcount > 0:
-                    self.add_timeline_event(
-                        booking_id=booking_id,
-                        event_type='booking_status_updated',
-                        event_description=f'Status changed to {status}',
-                        event_data={'new_status': status},
-                        triggered_by_user_id=triggered_by_user_id
-                    )
-                    return True
-                return False
+            with self.storage.cursor() as cur:
+                # rowcount is the number of timeline rows, one per updated booking
+                execute_prepared(cur, 'update_booking_status', _UPDATE_BOOKING_STATUS_SQL,
+                                 (status, booking_id, triggered_by_user_id))
+                return cur.rowcount > 0
                 
         except Exception as e:
             print(f"Error updating booking status: {e}")
             return False
     
-    def get_booking_context(self, booking_id: str) -> Dict[str, Any]:
+    def cancel_booking(self, booking_id: str, user_id: int, reason: Optional[str] = None,
+                       *, include_steps: bool = False) -> CancellationResult:
+        """
+        Cancel a booking with its provider (if placed) and record the cancellation
+        
+        Expected failures come back as an unsuccessful CancellationResult; database
+        errors propagate to the caller instead of being converted here. The per-step
+        audit trail is only collected when include_steps is set.
+        """
+        if not self.storage.conn:
+            return CancellationResult(False, booking_id, error="Database not available")
+        
+        booking = self._get_cancellation_snapshot(booking_id)
+        if not booking:
+            return CancellationResult(False, booking_id, error="Booking not found")
+        
+        if booking['primary_user_id'] != user_id:
+            return CancellationResult(False, booking_id, error="Access denied to this booking")
+        
+        if booking['booking_status'] == 'cancelled':
+            return CancellationResult(False, booking_id, error="Booking is already cancelled")
+        
+        steps = [] if include_steps else None
+        result = CancellationResult(True, booking_id, steps=steps, currency=booking['currency'],
+                                    total_amount=float(booking['total_amount']))
+        
+        # Cancel with the provider only if the booking was placed there
+        if booking['provider_booking_id']:
+            flight_service = self._get_flight_service()
+            if not flight_service:
+                return CancellationResult(False, booking_id, error="Flight service not available")
+            
+            # The provider knows the booking by its PNR, not by our reference.
+            # FlightService reports provider failures in the response, it does not raise
+            cancellation_response = flight_service.cancel_booking(
+                booking['provider_pnr'], booking['provider_name']
+            )
+            if steps is not None:
+                steps.append({
+                    'step': 'provider_cancellation',
+                    'success': cancellation_response.success
+                })
+            if not cancellation_response.success:
+                result.success = False
+                result.error = f"Provider cancellation failed: {cancellation_response.error_message}"
+                return result
+            result.refund_amount = float(cancellation_response.refund_amount or 0)
+        
+        with self.storage.cursor() as cur:
+            execute_prepared(cur, 'cancel_booking', _CANCEL_BOOKING_SQL, (
+                booking_id,
+                _CANCEL_EVENT_PREFIX + reason if reason else 'Booking cancelled',
+                _jsonb({'reason': reason, 'refund_amount': result.refund_amount}),
+                user_id
+            ))
+            row = cur.fetchone()
+        
+        if steps is not None:
+            steps.append({'step': 'booking_update', 'success': bool(row)})
+        if not row:
+            result.success = False
+            result.error = "Failed to cancel booking"
+            return result
+        
+        result.cancelled_at = row[0].isoformat()
+        return result
+    
+    def _get_cancellation_snapshot(self, booking_id: str) -> Optional[Dict[str, Any]]:
+        """Get only the booking columns the cancellation path reads"""
+        if not self.storage.conn:
+            return None
+        
+        with self.storage.cursor() as cur:
+            execute_prepared(cur, 'get_cancellation_snapshot', _GET_CANCELLATION_SNAPSHOT_SQL, (booking_id,))
+            
+            row = cur.fetchone()
+            if not row:
+                return None
+            
+            return {
+                'primary_user_id': row[0], 'booking_reference': row[1],
+                'booking_status': row[2], 'payment_status': row[3],
+                'provider_name': row[4], 'provider_booking_id': row[5],
+                'provider_pnr': row[6], 'total_amount': row[7], 'currency': row[8]
+            }
+    
+    def _get_booking_with_counts(self, booking_id: str) -> Optional[Tuple[Booking, int]]:
+        """Get a booking together with its booking_passengers count in one query"""
+        if not self.storage.conn:
+            return None
+        
+        with self.storage.cursor() as cur:
+            execute_prepared(cur, 'get_booking_with_counts', _GET_BOOKING_WITH_COUNTS_SQL, (booking_id,))
+            
+            row = cur.fetchone()
+            if not row:
+                return None
+            return self._row_to_booking(row[:-1]), row[-1]
+    
+    def get_booking_for_user(self, booking_id: str, user_id: int) -> Optional[Tuple[Booking, int]]:
+        """Get a booking owned by user_id together with its booking_passengers count in one query"""
+        if not self.storage.conn:
+            return None
+        
+        with self.storage.cursor() as cur:
+            execute_prepared(cur, 'get_booking_for_user_with_counts', _GET_BOOKING_FOR_USER_WITH_COUNTS_SQL,
+                             (booking_id, user_id))
+            
+            row = cur.fetchone()
+            if not row:
+                return None
+            return self._row_to_booking(row[:-1]), row[-1]
+    
+    def get_booking_context(self, booking_id: str,
+                            booking_with_counts: Optional[Tuple[Booking, int]] = None) -> Dict[str, Any]:
         """Get essential booking context for model decision-making"""
         try:
-            booking = self.get_booking(booking_id)
-            if not booking:
+            # Callers that already hold the booking and its passenger count pass them in
+            if booking_with_counts is None:
+                booking_with_counts = self._get_booking_with_counts(booking_id)
+            if not booking_with_counts:
                 return {"error": "Booking not found"}
             
-            # Get passenger count from booking_passengers table
-            current_passengers = 0
-            if self.storage.conn:
-                with self.storage.conn.cursor() as cur:
-                    cur.execute("SELECT COUNT(*) FROM booking_passengers WHERE booking_id = %s", (booking_id,))
-                    result = cur.fetchone()
-                    if result:
-                        current_passengers = result[0]
+            booking, current_passengers = booking_with_counts
             
             # Calculate completion status
             passengers_complete = current_passengers >= booking.group_size
@@ -389,75 +978,86 @@ class BookingStorageService:
             status_filter = kwargs.get('status')
             include_past = kwargs.get('include_past', False)
             
-            bookings = self.get_bookings_for_user(user_id, limit=50)
-            
-            # Apply filters
-            if status_filter:
-                bookings = [b for b in bookings if b.booking_status == status_filter]
-            
-            if not include_past:
-                current_time = datetime.now()
-                bookings = [b for b in bookings if b.departure_date and b.departure_date >= current_time.date()]
+            # Filters are applied in SQL so the 50-row page only holds matching bookings
+            bookings = self._list_user_bookings_summary(
+                user_id,
+                status=status_filter or None,
+                include_past=bool(include_past),
+                limit=50
+            )
             
             return {
                 'success': True,
-                'bookings': [
-                    {
-                        'booking_id': b.id,
-                        'booking_reference': b.booking_reference,
-                        'status': b.booking_status,
-                        'origin': b.origin_airport,
-                        'destination': b.destination_airport,
-                        'departure_date': b.departure_date.isoformat() if b.departure_date else None,
-                        'total_amount': float(b.total_amount),
-                        'currency': b.currency,
-                        'pnr': b.provider_pnr
-                    } for b in bookings
-                ]
+                'bookings': bookings
             }
             
         except Exception as e:
             return {"error": f"Get user bookings failed: {str(e)}"}
     
+    def _list_user_bookings_summary(self, user_id: int, status: Optional[str] = None,
+                                    include_past: bool = True,
+                                    limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        List a user's bookings as response dicts, reading only the columns they show.
+        Without include_past only trips departing today or later (database date) are listed.
+        """
+        if not self.storage.conn:
+            return []
+        
+        with self.storage.cursor() as cur:
+            execute_prepared(cur, 'get_user_booking_summaries', _GET_USER_BOOKING_SUMMARIES_SQL,
+                             (user_id, limit, status, include_past))
+            
+            return [
+                {
+                    'booking_id': booking_id,
+                    'booking_reference': booking_reference,
+                    'status': booking_status,
+                    'origin': origin_airport,
+                    'destination': destination_airport,
+                    'departure_date': departure_date.isoformat() if departure_date else None,
+                    'total_amount': float(total_amount),
+                    'currency': currency,
+                    'pnr': provider_pnr
+                }
+                for (booking_id, booking_reference, booking_status, origin_airport,
+                     destination_airport, departure_date, total_amount, currency,
+                     provider_pnr) in cur
+            ]
+    
     # ====================================================================
     # FLIGHT SEGMENT MANAGEMENT
     # ====================================================================
     
     def add_flight_segment(self, booking_id: str, **segment_data) -> Optional[str]:
         """Add a flight segment to a booking"""
-        if not self.storage.conn:
-            return None
+        segment_ids = self.add_flight_segments(booking_id, [segment_data])
+        return segment_ids[0] if segment_ids else None
+    
+    def add_flight_segments(self, booking_id: str, segments: List[Dict[str, Any]]) -> List[str]:
+        """Add several flight segments to a booking in one INSERT, returning their IDs in order"""
+        if not self.storage.conn or not segments:
+            return []
         
         try:
-            with self.storage.conn.cursor() as cur:
-                # Get next segment sequence number
-                cur.execute("""
-                    SELECT COALESCE(MAX(segment_sequence), 0) + 1
-                    FROM booking_flight_segments WHERE booking_id = %s;
-                """, (booking_id,))
-                
-                segment_data['booking_id'] = booking_id
-                result = cur.fetchone()
-                if result:
-                    segment_data['segment_sequence'] = result[0]
-                
-                # Build insert query
-                fields = list(segment_data.keys())
-                placeholders = ', '.join(['%s'] * len(fields))
-                field_names = ', '.join(fields)
-                
-                cur.execute(f"""
-                    INSERT INTO booking_flight_segments ({field_names})
-                    VALUES ({placeholders})
-                    RETURNING id;
-                """, list(segment_data.values()))
+            with self.storage.cursor() as cur:
+                rows = [
+                    (booking_id, booking_id, offset) + tuple(
+                        segment.get(column, _SEGMENT_DEFAULTS.get(column))
+                        for column in _SEGMENT_INSERT_COLUMNS
+                    )
+                    for offset, segment in enumerate(segments, 1)
+                ]
                 
-                result = cur.fetchone()
-                return result[0] if result else None
+                # One page keeps every row numbered against the same sequence base;
+                # execute_values returns RETURNING rows in VALUES order when fetch=True
+                results = execute_values(cur, _SEGMENT_INSERT_SQL, rows, template=_SEGMENT_ROW_TEMPLATE,
+                                         page_size=len(rows), fetch=True)
+                return [row[0] for row in results]
                 
         except Exception as e:
-            print(f"Error adding flight segment: {e}")
-            return None
+            print(f"Error adding flight segments: {e}")
+            return []
     
     def get_booking_flight_segments(self, booking_id: str) -> List[BookingFlightSegment]:
         """Get all flight segments for a booking"""
@@ -465,33 +1065,13 @@ class BookingStorageService:
             return []
         
         try:
-            with self.storage.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, booking_id, flight_offer_id, segment_sequence, segment_type,
-                           airline_code, airline_name, flight_number, aircraft_type,
-                           departure_airport, departure_terminal, departure_time,
-                           arrival_airport, arrival_terminal, arrival_time, duration_minutes,
-                           distance_km, flight_status, actual_departure_time, 
-                           actual_arrival_time, delay_minutes, gate_info, created_at, updated_at
-                    FROM booking_flight_segments 
-                    WHERE booking_id = %s 
-                    ORDER BY segment_sequence;
-                """, (booking_id,))
+            with self.storage.cursor() as cur:
+                execute_prepared(cur, 'get_booking_segments', _GET_SEGMENTS_SQL, (booking_id,))
                 
+                # Iterate the cursor directly so no intermediate list of row tuples is built
                 return [
-                    BookingFlightSegment(
-                        id=row[0], booking_id=row[1], flight_offer_id=row[2],
-                        segment_sequence=row[3], segment_type=row[4], airline_code=row[5],
-                        airline_name=row[6], flight_number=row[7], aircraft_type=row[8],
-                        departure_airport=row[9], departure_terminal=row[10],
-                        departure_time=row[11], arrival_airport=row[12],
-                        arrival_terminal=row[13], arrival_time=row[14],
-                        duration_minutes=row[15], distance_km=row[16],
-                        flight_status=row[17], actual_departure_time=row[18],
-                        actual_arrival_time=row[19], delay_minutes=row[20],
-                        gate_info=row[21], created_at=row[22], updated_at=row[23]
-                    )
-                    for row in cur.fetchall()
+                    BookingFlightSegment(*row)
+                    for row in cur
                 ]
                 
         except Exception as e:
@@ -511,47 +1091,50 @@ class BookingStorageService:
         if not self.storage.conn:
             return False
         
+        row = _timeline_row(booking_id, event_type, event_description, event_data,
+                            triggered_by_user_id, system_event)
+        
+        return self._insert_timeline_rows([row])
+    
+    def add_timeline_events(self, events: List[Dict[str, Any]]) -> bool:
+        """
+        Write several timeline events at once with a single multi-row INSERT.
+        Each event is a dict of add_timeline_event's keyword arguments.
+        """
+        if not self.storage.conn:
+            return False
+        if not events:
+            return True
+        
+        return self._insert_timeline_rows([_timeline_row(**event) for event in events])
+    
+    def _insert_timeline_rows(self, rows: List[tuple]) -> bool:
+        """Insert timeline rows with a single multi-row INSERT"""
+        if not self.storage.conn:
+            return False
+        
         try:
-            with self.storage.conn.cursor() as cur:
-                cur.execute("""
-                    INSERT INTO booking_timeline (
-                        booking_id, event_type, event_description, event_data,
-                        triggered_by_user_id, system_event
-                    ) VALUES (%s, %s, %s, %s, %s, %s);
-                """, (
-                    booking_id, event_type, event_description,
-                    json.dumps(event_data or {}), triggered_by_user_id, system_event
-                ))
-                
+            with self.storage.cursor() as cur:
+                # One page covers every row, so the whole batch is a single round trip
+                execute_values(cur, _TIMELINE_INSERT_SQL, rows,
+                               template=_TIMELINE_ROW_TEMPLATE, page_size=len(rows))
                 return True
                 
-        except Exception as e:
-            print(f"Error adding timeline event: {e}")
+        except Exception:
+            logger.exception("Failed to add %d timeline event(s)", len(rows))
             return False
     
-    def get_booking_timeline(self, booking_id: str) -> List[BookingTimelineEvent]:
-        """Get timeline events for a booking"""
+    def get_booking_timeline(self, booking_id: str, limit: int = 100,
+                             offset: int = 0) -> List[BookingTimelineEvent]:
+        """Get a page of timeline events for a booking, newest first"""
         if not self.storage.conn:
             return []
         
         try:
-            with self.storage.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT id, booking_id, event_type, event_description, event_data,
-                           triggered_by_user_id, system_event, created_at
-                    FROM booking_timeline 
-                    WHERE booking_id = %s 
-                    ORDER BY created_at DESC;
-                """, (booking_id,))
+            with self.storage.cursor() as cur:
+                execute_prepared(cur, 'get_booking_timeline', _GET_TIMELINE_SQL, (booking_id, limit, offset))
                 
-                return [
-                    BookingTimelineEvent(
-                        id=row[0], booking_id=row[1], event_type=row[2],
-                        event_description=row[3], event_data=self._safe_json_parse(row[4], {}), # type: ignore
-                        triggered_by_user_id=row[5], system_event=row[6], created_at=row[7]
-                    )
-                    for row in cur.fetchall()
-                ]
+                return [self._row_to_timeline_event(row) for row in cur]
                 
         except Exception as e:
             print(f"Error getting timeline: {e}")
@@ -565,18 +1148,10 @@ class BookingStorageService:
         """Main handler for all booking operations from tools"""
         operation = kwargs.get('action', 'create')
         
-        if operation == 'create':
-            return self._handle_create_booking(user_id, **kwargs)
-        elif operation == 'get':
-            return self._handle_get_booking_context(user_id, **kwargs)
-        elif operation == 'update_booking':
-            return self._handle_update_booking(user_id, **kwargs)
-        elif operation == 'add_emergency_contact':
-            return self._handle_add_emergency_contact(user_id, **kwargs)
-        elif operation == 'finalize':
-            return self._handle_finalize_booking(user_id, **kwargs)
-        else:
+        handler_name = self._OPERATION_HANDLERS.get(operation)
+        if not handler_name:
             return {"error": f"Unknown operation: {operation}"}
+        return getattr(self, handler_name)(user_id, **kwargs)
     
     # ====================================================================
     # PRIVATE OPERATION HANDLERS
@@ -591,11 +1166,12 @@ class BookingStorageService:
             if not search_id:
                 return {"error": "Search ID required for booking creation"}
             
-            # Get cached search data if shared_storage is available
-            search_data = None
+            # Get cached search parameters if shared_storage is available; the
+            # (much larger) search results themselves are not needed here
+            search_params = None
             if self.shared_storage:
-                search_data = self.shared_storage.get_cached_search(user_id, search_id)
-                if not search_data:
+                search_params = self.shared_storage.get_cached_search_params(user_id, search_id)
+                if search_params is None:
                     return {"error": "Search results expired. Please search again."}
             
             # Create booking with basic info
@@ -618,14 +1194,14 @@ class BookingStorageService:
                 'travel_insurance': False
             }
             
-            # Add search data if available
-            if search_data:
+            # Add route details from the search if available
+            if search_params:
                 booking_data.update({
-                    'trip_type': search_data.get('trip_type', 'one_way'),
-                    'origin_airport': search_data.get('origin'),
-                    'destination_airport': search_data.get('destination'),
-                    'departure_date': search_data.get('departure_date'),
-                    'return_date': search_data.get('return_date')
+                    'trip_type': 'round_trip' if search_params.get('return_date') else 'one_way',
+                    'origin_airport': search_params.get('origin'),
+                    'destination_airport': search_params.get('destination'),
+                    'departure_date': search_params.get('departure_date'),
+                    'return_date': search_params.get('return_date')
                 })
             
             booking_id = self.create_booking(**booking_data)
@@ -652,15 +1228,12 @@ class BookingStorageService:
             if not booking_id:
                 return {"error": "booking_id required"}
             
-            # Verify booking belongs to user
-            booking = self.get_booking(str(booking_id))
-            if not booking:
-                return {"error": "Booking not found"}
-            
-            if booking.primary_user_id != user_id:
-                return {"error": "Access denied to this booking"}
+            booking_with_counts = self.get_booking_for_user(str(booking_id), user_id)
+            if not booking_with_counts:
+                # Only a miss pays for the lookup that explains why
+                return self._access_error(str(booking_id), user_id) or {"error": "Booking not found"}
             
-            return self.get_booking_context(str(booking_id))
+            return self.get_booking_context(str(booking_id), booking_with_counts)
             
         except Exception as e:
             return {"error": f"Get booking context failed: {str(e)}"}
@@ -670,47 +1243,33 @@ class BookingStorageService:
         try:
             booking_id = str(kwargs.get('booking_id'))
             
-            # Verify booking exists and belongs to user
-            booking = self.get_booking(booking_id)
-            if not booking:
-                return {"error": "Booking not found"}
-            
-            if booking.primary_user_id != user_id:
-                return {"error": "Access denied to this booking"}
-            
             # Build update data
-            update_data = {}
-            updated_fields = []
-            
-            # Update fields
-            for field in ['group_size', 'booking_type', 'special_requests', 'accessibility_requirements']:
-                if field in kwargs:
-                    update_data[field] = kwargs[field]
-                    updated_fields.append(field)
+            update_data = {k: v for k, v in kwargs.items() if k in _BOOKING_UPDATE_FIELDS}
+            updated_fields = list(update_data)
             
             if not update_data:
                 return {"error": "No changes detected"}
             
-            # Perform the update
-            success = self.update_booking(booking_id, update_data)
+            timeline_event = {
+                'event_type': 'booking_updated',
+                'event_description': f'Booking details updated: {", ".join(updated_fields)}',
+                'event_data': {'updated_fields': updated_fields, 'changes': update_data},
+                'triggered_by_user_id': user_id
+            }
             
-            if success:
-                self.add_timeline_event(
-                    booking_id=booking_id,
-                    event_type='booking_updated',
-                    event_description=f'Booking details updated: {", ".join(updated_fields)}',
-                    event_data={'updated_fields': updated_fields, 'changes': update_data},
-                    triggered_by_user_id=user_id
-                )
-                
-                return {
-                    'success': True,
-                    'booking_id': booking_id,
-                    'updated_fields': updated_fields,
-                    'message': f'Booking updated successfully'
-                }
-            else:
-                return {"error": "Failed to update booking"}
+            # Perform the update and log it in one statement; the ownership check is part
+            # of the UPDATE itself, and re-sending identical values writes neither
+            response = self.update_booking_if_owner(booking_id, user_id, update_data, skip_unchanged=True,
+                                                    timeline_event=timeline_event)
+            if response:
+                return response
+            
+            return {
+                'success': True,
+                'booking_id': booking_id,
+                'updated_fields': updated_fields,
+                'message': f'Booking updated successfully'
+            }
                 
         except Exception as e:
             return {"error": f"Update booking failed: {str(e)}"}
@@ -720,43 +1279,32 @@ class BookingStorageService:
         try:
             booking_id = str(kwargs.get('booking_id'))
             
-            # Verify booking exists and belongs to user
-            booking = self.get_booking(booking_id)
-            if not booking:
-                return {"error": "Booking not found"}
-            
-            if booking.primary_user_id != user_id:
-                return {"error": "Access denied to this booking"}
-            
             # Build emergency contact data
-            emergency_data = {}
-            for field in ['emergency_contact_name', 'emergency_contact_phone', 
-                         'emergency_contact_relationship', 'emergency_contact_email']:
-                if field in kwargs:
-                    emergency_data[field] = kwargs[field]
+            emergency_data = {k: v for k, v in kwargs.items() if k in _EMERGENCY_CONTACT_FIELDS}
             
             if not emergency_data:
                 return {"error": "No emergency contact information provided"}
             
-            # Update booking with emergency contact
-            success = self.update_booking(booking_id, emergency_data)
+            timeline_event = {
+                'event_type': 'emergency_contact_added',
+                'event_description': 'Emergency contact information added',
+                'event_data': emergency_data,
+                'triggered_by_user_id': user_id
+            }
             
-            if success:
-                self.add_timeline_event(
-                    booking_id=booking_id,
-                    event_type='emergency_contact_added',
-                    event_description='Emergency contact information added',
-                    event_data=emergency_data,
-                    triggered_by_user_id=user_id
-                )
-                
-                return {
-                    'success': True,
-                    'booking_id': booking_id,
-                    'message': 'Emergency contact information added successfully'
-                }
-            else:
-                return {"error": "Failed to add emergency contact information"}
+            # Update booking with emergency contact and log it in one statement; the
+            # ownership check is part of the UPDATE
+            error = self.update_booking_if_owner(booking_id, user_id, emergency_data,
+                                                 "Failed to add emergency contact information",
+                                                 timeline_event=timeline_event)
+            if error:
+                return error
+            
+            return {
+                'success': True,
+                'booking_id': booking_id,
+                'message': 'Emergency contact information added successfully'
+            }
                 
         except Exception as e:
             return {"error": f"Add emergency contact failed: {str(e)}"}
@@ -766,16 +1314,17 @@ class BookingStorageService:
         try:
             booking_id = str(kwargs.get('booking_id'))
             
-            # Verify booking exists and belongs to user
-            booking = self.get_booking(booking_id)
-            if not booking:
-                return {"error": "Booking not found"}
+            # Verify booking exists and belongs to user; the readiness check and the
+            # provider call below reuse this snapshot rather than fetching the booking again
+            snapshot = self._get_finalize_snapshot(booking_id, user_id)
+            if not snapshot:
+                return self._access_error(booking_id, user_id) or {"error": "Booking not found"}
             
-            if booking.primary_user_id != user_id:
-                return {"error": "Access denied to this booking"}
+            booking, passenger_count, passengers = snapshot
+            booking_with_counts = (booking, passenger_count)
             
             # Check if booking is ready for finalization
-            booking_context = self.get_booking_context(booking_id)
+            booking_context = self.get_booking_context(booking_id, booking_with_counts)
             if 'error' in booking_context:
                 return {"error": f"Cannot get booking status: {booking_context['error']}"}
             
@@ -800,47 +1349,37 @@ class BookingStorageService:
             provider_name = booking.provider_name or "duffel"
 
             # Extract offer ID - handle different formats
-            offer_id = None
-            if isinstance(selected_offers, list) and len(selected_offers) > 0:
-                # Could be a list of strings or list of dicts
-                first_offer = selected_offers[0]
-                if isinstance(first_offer, str):
-                    offer_id = first_offer
-                elif isinstance(first_offer, dict):
-                    # If it's a dict, look for common ID fields
-                    offer_id = first_offer.get('id') or first_offer.get('offer_id') or first_offer.get('flight_offer_id')
-                else:
-                    return {"error": f"Unexpected offer format: {type(first_offer)}"}
-            elif isinstance(selected_offers, str):
-                offer_id = selected_offers
-            else:
+            offer_entry = _SELECTED_OFFER_ENTRY.get(type(selected_offers))
+            if not offer_entry:
                 return {"error": f"Invalid flight offer format in booking: {type(selected_offers)}"}
+            first_offer = offer_entry(selected_offers)
+            extract_offer_id = _OFFER_ID_EXTRACTORS.get(type(first_offer))
+            if not extract_offer_id:
+                return {"error": f"Unexpected offer format: {type(first_offer)}"}
+            offer_id = extract_offer_id(first_offer)
 
             if not offer_id:
                 return {"error": "Could not extract offer ID from selected offers"}
 
-            # Clean up offer ID to get provider offer ID
-            if isinstance(offer_id, str) and offer_id.startswith(f"{provider_name}_"):
-                clean_offer_id = offer_id.replace(f"{provider_name}_", "")
+            # Clean up offer ID to get provider offer ID; only the leading provider
+            # prefix is stripped
+            if isinstance(offer_id, str):
+                clean_offer_id = offer_id.removeprefix(f"{provider_name}_")
             else:
                 clean_offer_id = str(offer_id)  # Ensure it's a string
             
+            # Passenger data for the provider came with the snapshot, so a booking
+            # without passengers is rejected before spending a provider round trip
+            if not passengers:
+                return {"error": "No passengers found for booking"}
+            
             # Get final pricing from provider
             pricing_response = flight_service.get_final_price(clean_offer_id, provider_name)
             if not pricing_response.success:
                 return {"error": f"Failed to get final pricing: {pricing_response.error_message}"}
             
-            # Get passenger data for booking
-            passengers = self._get_passengers_for_booking(booking_id)
-            if not passengers:
-                return {"error": "No passengers found for booking"}
-            
-            # Generate booking reference if not exists
-            if not booking.booking_reference:
-                booking_reference = self._generate_booking_reference()
-                self.update_booking(booking_id, {"booking_reference": booking_reference})
-            else:
-                booking_reference = booking.booking_reference
+            # Every booking gets its reference from the database at creation
+            booking_reference = booking.booking_reference
             
             # Create booking with provider
             booking_response = flight_service.create_booking(
@@ -866,24 +1405,24 @@ class BookingStorageService:
                 'currency': pricing_response.currency
             }
             
-            success = self.update_booking(booking_id, update_data)
-            
-            if not success:
-                return {"error": "Failed to update booking with provider information"}
-            
-            # Add timeline event
-            self.add_timeline_event(
-                booking_id=booking_id,
-                event_type='booking_finalized',
-                event_description='Booking finalized with airline, awaiting payment',
-                event_data={
+            timeline_event = {
+                'event_type': 'booking_finalized',
+                'event_description': 'Booking finalized with airline, awaiting payment',
+                'event_data': {
                     'provider': provider_name,
                     'pnr': booking_response.booking_reference,
                     'final_amount': final_amount,
                     'currency': pricing_response.currency
                 },
-                triggered_by_user_id=user_id
-            )
+                'triggered_by_user_id': user_id
+            }
+            
+            # The provider details and the finalization event are committed together
+            error = self.update_booking_if_owner(booking_id, user_id, update_data,
+                                                 "Failed to update booking with provider information",
+                                                 timeline_event=timeline_event)
+            if error:
+                return error
             
             return {
                 'success': True,
@@ -898,109 +1437,85 @@ class BookingStorageService:
             }
             
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Finalization failed for booking %s", kwargs.get('booking_id'))
             return {"error": f"Finalization failed: {str(e)}"}
 
+    def _handle_cancel_booking(self, user_id: int, **kwargs) -> Dict[str, Any]:
+        """Handle booking cancellation from tool"""
+        try:
+            booking_id = kwargs.get('booking_id')
+            if not booking_id:
+                return {"error": "booking_id required"}
+            
+            result = self.cancel_booking(str(booking_id), user_id, kwargs.get('reason'), include_steps=True)
+            return result.to_dict()
+            
+        except Exception as e:
+            logger.exception("Cancellation failed for booking %s", kwargs.get('booking_id'))
+            return {"error": f"Cancel booking failed: {str(e)}"}
+
     def _get_flight_service(self) -> Optional[FlightService]:
-        """Get flight service instance - to be injected via constructor"""
-        # This should be injected in the constructor
-        # For now, we'll assume it's available in shared_storage or similar
-        return getattr(self, 'flight_service', None)
+        """Get the injected flight service instance"""
+        return self.flight_service
 
+    def _get_finalize_snapshot(self, booking_id: str, user_id: int) -> Optional[Tuple[Booking, int, List[Passenger]]]:
+        """Get an owned booking, its passenger count and its provider-formatted passengers in one query"""
+        if not self.storage.conn:
+            return None
+        
+        with self.storage.cursor() as cur:
+            execute_prepared(cur, 'get_finalize_snapshot', _GET_FINALIZE_SNAPSHOT_SQL, (booking_id, user_id))
+            
+            row = cur.fetchone()
+            if not row:
+                return None
+            passengers = [self._row_to_provider_passenger(passenger) for passenger in row[-1]]
+            return self._row_to_booking(row[:-2]), row[-2], passengers
+    
     def _get_passengers_for_booking(self, booking_id: str) -> List:
         """Get passengers formatted for provider APIs"""
         if not self.storage.conn:
             return []
         
         try:
-            with self.storage.conn.cursor() as cur:
-                cur.execute("""
-                    SELECT first_name, last_name, date_of_birth, gender, nationality,
-                        passport_number, document_expiry, seat_preference, meal_preference
-                    FROM booking_passengers 
-                    WHERE booking_id = %s 
-                    ORDER BY created_at;
-                """, (booking_id,))
+            with self.storage.cursor() as cur:
+                execute_prepared(cur, 'get_provider_passengers', _GET_PROVIDER_PASSENGERS_SQL, (booking_id,))
                 
-                passengers = []
-                for row in cur.fetchall():
-                    # Convert date strings to datetime objects
-                    date_of_birth = row[2] if isinstance(row[2], datetime) else datetime.fromisoformat(row[2]) if row[2] else datetime(1990, 1, 1)
-                    passport_expiry = None
-                    if row[6]:
-                        passport_expiry = row[6] if isinstance(row[6], datetime) else datetime.fromisoformat(row[6])
-                    
-                    passenger = Passenger(
-                        passenger_type=PassengerType.ADULT,  # Default, could be enhanced
-                        first_name=row[0] or "",
-                        last_name=row[1] or "",
-                        date_of_birth=date_of_birth,
-                        gender=row[3] or "M",
-                        email="",  # Would need to be stored separately
-                        phone="",  # Would need to be stored separately
-                        nationality=row[4] or "US",
-                        passport_number=row[5],
-                        passport_expiry=passport_expiry
-                    )
-                    passengers.append(passenger)
-                
-                return passengers
+                return [self._row_to_provider_passenger(row) for row in cur]
                 
         except Exception as e:
             print(f"Error getting passengers for booking: {e}")
             return []
     
+    def _row_to_provider_passenger(self, row) -> Passenger:
+        """Convert a _PROVIDER_PASSENGER_COLUMNS row (tuple, or JSON array with ISO dates) to a Passenger"""
+        # Defaults were applied in SQL; dates arrive as datetime from a row, or as
+        # ISO strings from JSON
+        return Passenger(
+            passenger_type=PassengerType.ADULT,  # Default, could be enhanced
+            first_name=row[0],
+            last_name=row[1],
+            date_of_birth=_as_datetime(row[2]),
+            gender=row[3],
+            email="",  # Would need to be stored separately
+            phone="",  # Would need to be stored separately
+            nationality=row[4],
+            passport_number=row[5],
+            passport_expiry=_as_datetime(row[6])
+        )
+    
     # ====================================================================
     # UTILITY METHODS
     # ====================================================================
     
-    def _safe_json_parse(self, value, default=None):
-        """Safely parse JSON data that might already be parsed"""
-        if value is None:
-            return default if default is not None else {}
-        if isinstance(value, (dict, list)):
-            return value
-        if isinstance(value, str):
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                print(f"Warning: Failed to parse JSON: {value}")
-                return default if default is not None else {}
-        return default if default is not None else {}
-    
     def _row_to_booking(self, row) -> Booking:
-        """Convert database row to Booking object"""
-        return Booking(
-            id=row[0], booking_reference=row[1], primary_user_id=row[2],
-            group_size=row[3], booking_type=row[4], search_id=row[5],
-            selected_flight_offers=self._safe_json_parse(row[6], []), # type: ignore
-            trip_type=row[7], origin_airport=row[8], destination_airport=row[9],
-            departure_date=row[10], return_date=row[11], base_price=row[12],
-            taxes_and_fees=row[13], service_fee=row[14], insurance_fee=row[15],
-            total_amount=row[16], currency=row[17], booking_status=row[18],
-            payment_status=row[19], fulfillment_status=row[20],
-            provider_name=row[21], provider_booking_id=row[22], 
-            provider_pnr=row[23], provider_response=self._safe_json_parse(row[24], {}), # type: ignore
-            travel_insurance=row[25], special_requests=row[26],
-            accessibility_requirements=row[27], emergency_contact_name=row[28],
-            emergency_contact_phone=row[29], emergency_contact_relationship=row[30],
-            emergency_contact_email=row[31], confirmation_deadline=row[32],
-            payment_deadline=row[33], checkin_available_at=row[34],
-            created_at=row[35], updated_at=row[36], confirmed_at=row[37],
-            cancelled_at=row[38]
-        )
+        """Convert database row (in _BOOKING_COLUMNS order) to Booking object"""
+        return Booking(*row)
+    
+    def _row_to_timeline_event(self, row) -> BookingTimelineEvent:
+        """Convert database row (in _TIMELINE_COLUMNS order) to BookingTimelineEvent object"""
+        return BookingTimelineEvent(*row)
     
-    def _generate_booking_reference(self) -> str:
-        """Generate a unique booking reference"""
-
-        # Generate format: ABC123DE (3 letters + 3 numbers + 2 letters)
-        letters = ''.join(random.choices(string.ascii_uppercase, k=3))
-        numbers = ''.join(random.choices(string.digits, k=3))
-        suffix = ''.join(random.choices(string.ascii_uppercase, k=2))
-        
-        return f"{letters}{numbers}{suffix}"
-        
     def _generate_booking_summary(self, booking, current_passengers, completion_status, next_actions) -> str:
         """Generate a human-readable summary for the model"""
         summary_parts = []
@@ -1013,27 +1528,16 @@ class BookingStorageService:
         if booking.origin_airport:
             route = f"{booking.origin_airport} → {booking.destination_airport}"
             if booking.departure_date:
-                route += f" on {booking.departure_date.strftime('%Y-%m-%d')}"
+                route += f" on {booking.departure_date.isoformat()}"
             summary_parts.append(route)
         
         # Progress summary
-        progress_parts = []
-        if completion_status["passengers_added"]:
-            progress_parts.append(f"✓ {current_passengers}/{booking.group_size} passengers")
-        else:
-            progress_parts.append(f"⚠ {current_passengers}/{booking.group_size} passengers")
-        
-        if completion_status["passenger_details_complete"]:
-            progress_parts.append("✓ Details complete")
-        else:
-            progress_parts.append("⚠ Details incomplete")
-        
-        if completion_status["emergency_contact_complete"]:
-            progress_parts.append("✓ Emergency contact")
-        else:
-            progress_parts.append("⚠ Emergency contact needed")
-        
-        summary_parts.append("Progress: " + ", ".join(progress_parts))
+        summary_parts.append(
+            f"Progress: {_PROGRESS_GLYPH[bool(completion_status['passengers_added'])]} "
+            f"{current_passengers}/{booking.group_size} passengers, "
+            f"{_DETAILS_PROGRESS[bool(completion_status['passenger_details_complete'])]}, "
+            f"{_EMERGENCY_CONTACT_PROGRESS[bool(completion_status['emergency_contact_complete'])]}"
+        )
         
         # Next actions
         if next_actions:
@@ -1050,159 +1554,110 @@ class BookingStorageService:
         # Generate tool call representation based on operation
         tool_call = self._generate_tool_call_string(operation, result, **kwargs)
         
-        # Start with tool call
-        context = f"{tool_call}\n"
-        
         # Handle errors first
         if 'error' in result:
-            context += f"Error: {result['error']}"
-            return context
+            return f"{tool_call}\nError: {result['error']}"
+        
+        # Start with tool call, then add operation-specific context
+        parts = [tool_call, "\n"]
+        template = _OPERATION_CONTEXT_TEMPLATES.get(operation)
         
-        # Add operation-specific context
         if operation == 'create':
-            search_id = result.get('search_id', '')
-            total_amount = result.get('total_amount', 0)
-            context += f"SUCCESS: Booking created\n"
-            context += f"Booking ID: {booking_id}\n"
-            context += f"Amount: ${total_amount}\n"
-            context += f"Status: Draft - needs passengers\n"
+            parts.append(template.format(booking_id=booking_id, total_amount=result.get('total_amount', 0)))
             
         elif operation == 'add_passenger':
-            first_name = result.get('first_name', '')
-            last_name = result.get('last_name', '')
-            total = result.get('total_passengers', 0)
-            required = result.get('required_passengers', 1)
-            
-            context += f"SUCCESS: Passenger added\n"
-            context += f"Added: {first_name} {last_name}\n"
-            context += f"Progress: {total}/{required} passengers\n"
-            
-        elif operation == 'update_passenger':
-            context += f"SUCCESS: Passenger details updated\n"
+            parts.append(template.format(
+                first_name=result.get('first_name', ''),
+                last_name=result.get('last_name', ''),
+                total=result.get('total_passengers', 0),
+                required=result.get('required_passengers', 1),
+            ))
             
         elif operation == 'update_booking':
+            parts.append(template)
             updated_fields = result.get('updated_fields', [])
-            context += f"SUCCESS: Booking updated\n"
             if updated_fields:
-                context += f"Updated: {', '.join(updated_fields)}\n"
+                parts.append(f"Updated: {', '.join(updated_fields)}\n")
                 
-        elif operation == 'add_emergency_contact':
-            context += f"SUCCESS: Emergency contact added\n"
-            
         elif operation == 'finalize':
             pnr = result.get('pnr', '')
             final_price = result.get('final_price', 0)
-            payment_url = result.get('payment_url', '')
             
-            context += f"SUCCESS: Booking finalized\n"
+            parts.append(template)
             if pnr:
-                context += f"PNR: {pnr}\n"
+                parts.append(f"PNR: {pnr}\n")
             
             try:
                 price_str = f"${float(final_price):.0f}" if final_price else "$0"
             except (ValueError, TypeError):
                 price_str = "Price TBD"
             
-            context += f"Final price: {price_str}\n"
-            if payment_url:
-                context += "Payment link generated - user must pay to complete\n"
+            parts.append(f"Final price: {price_str}\n")
+            if result.get('payment_url', ''):
+                parts.append("Payment link generated - user must pay to complete\n")
+                
+        elif template:
+            parts.append(template)
                 
         # Add comprehensive booking status if we have a booking_id
         if booking_id:
-            context += "\n" + "="*50 + "\n"
-            context += "CURRENT BOOKING STATUS:\n"
+            parts.append(_BOOKING_STATUS_HEADER)
             
             booking_context = self.get_booking_context(booking_id)
             if 'error' not in booking_context:
                 # Add booking summary
                 summary = booking_context.get('summary', '')
                 if summary:
-                    context += f"{summary}\n\n"
+                    parts.append(f"{summary}\n\n")
                 
                 # Add detailed next actions
                 next_actions = booking_context.get('next_actions', [])
                 if next_actions:
-                    context += "NEXT ACTIONS NEEDED:\n"
+                    parts.append("NEXT ACTIONS NEEDED:\n")
                     for i, action in enumerate(next_actions[:3], 1):  # Show top 3 actions
-                        context += f"{i}. {action['description']}\n"
-                        context += f"   Call: {action['tool_call']}\n"
+                        parts.append(f"{i}. {action['description']}\n   Call: {action['tool_call']}\n")
                         if 'missing_fields' in action:
-                            context += f"   Missing: {', '.join(action['missing_fields'])}\n"
+                            parts.append(f"   Missing: {', '.join(action['missing_fields'])}\n")
                     
                     if len(next_actions) > 3:
-                        context += f"   ... and {len(next_actions) - 3} more actions\n"
+                        parts.append(f"   ... and {len(next_actions) - 3} more actions\n")
                 else:
                     # Check if ready for finalization
                     if booking_context.get('completion_status', {}).get('ready_for_finalization'):
-                        context += "READY FOR FINALIZATION!\n"
-                        context += f"Call: finalize_booking(booking_id='{booking_id}')\n"
+                        parts.append(f"READY FOR FINALIZATION!\nCall: finalize_booking(booking_id='{booking_id}')\n")
                     else:
-                        context += "Booking in progress...\n"
+                        parts.append("Booking in progress...\n")
                 
                 # Add passenger details summary
                 passengers = booking_context.get('passengers', {})
                 if passengers.get('list'):
-                    context += f"\nPASSENGERS ({passengers['current_count']}/{passengers['required_count']}):\n"
+                    parts.append(f"\nPASSENGERS ({passengers['current_count']}/{passengers['required_count']}):\n")
                     for p in passengers['list']:
                         name = f"{p.get('first_name', '')} {p.get('last_name', '')}"
-                        details = []
-                        if not p.get('date_of_birth'):
-                            details.append('DOB missing')
-                        if not p.get('nationality'):
-                            details.append('nationality missing')
-                        if not p.get('document_number'):
-                            details.append('passport missing')
-                        if not p.get('seat_preference'):
-                            details.append('seat pref missing')
-                        if not p.get('meal_preference'):
-                            details.append('meal pref missing')
+                        details = [label for field, label in _PASSENGER_MISSING_LABELS if not p.get(field)]
                         
                         status = " ⚠ " + ", ".join(details) if details else " ✓"
-                        context += f"• {name}{status}\n"
+                        parts.append(f"• {name}{status}\n")
                 
                 # Add emergency contact status
                 emergency = booking_context.get('emergency_contact', {})
                 if emergency.get('complete'):
-                    context += f"\nEMERGENCY CONTACT: ✓ {emergency.get('name')} ({emergency.get('relationship')})\n"
+                    parts.append(f"\nEMERGENCY CONTACT: ✓ {emergency.get('name')} ({emergency.get('relationship')})\n")
                 else:
-                    context += f"\nEMERGENCY CONTACT: ⚠ Not provided\n"
+                    parts.append("\nEMERGENCY CONTACT: ⚠ Not provided\n")
             else:
-                context += f"Could not retrieve booking status: {booking_context['error']}\n"
+                parts.append(f"Could not retrieve booking status: {booking_context['error']}\n")
         
-        return context
+        return ''.join(parts)
     
     def _generate_tool_call_string(self, operation: str, result: Dict[str, Any], **kwargs) -> str:
         """Generate the tool call string representation"""
         booking_id = result.get('booking_id', kwargs.get('booking_id', ''))
         
-        if operation == 'create':
-            search_id = result.get('search_id', kwargs.get('search_id', ''))
-            flight_offer_ids = kwargs.get('flight_offer_ids', [])
-            return f"<call>create_flight_booking(search_id='{search_id}', flight_offer_ids={flight_offer_ids})</call>"
-            
-        elif operation == 'add_passenger':
-            first_name = result.get('first_name', kwargs.get('first_name', ''))
-            last_name = result.get('last_name', kwargs.get('last_name', ''))
-            return f"<call>manage_booking_passengers(booking_id='{booking_id}', action='add', first_name='{first_name}', last_name='{last_name}', ...)</call>"
-            
-        elif operation == 'update_passenger':
-            passenger_id = result.get('passenger_id', kwargs.get('passenger_id', ''))
-            return f"<call>manage_booking_passengers(booking_id='{booking_id}', action='update', passenger_id='{passenger_id}', ...)</call>"
-            
-        elif operation == 'update_booking':
-            return f"<call>manage_booking_passengers(booking_id='{booking_id}', action='update_booking', ...)</call>"
-            
-        elif operation == 'get':
-            return f"<call>manage_booking_passengers(booking_id='{booking_id}', action='get')</call>"
-            
-        elif operation == 'add_emergency_contact':
-            return f"<call>manage_booking_passengers(booking_id='{booking_id}', action='add_emergency_contact', ...)</call>"
-            
-        elif operation == 'finalize':
-            return f"<call>finalize_booking(booking_id='{booking_id}')</call>"
-            
-        else:
-            return f"<call>booking_operation(action='{operation}', booking_id='{booking_id}')</call>"
+        builder = _TOOL_CALL_BUILDERS.get(operation)
+        if builder:
+            return builder(result, kwargs, booking_id)
+        return f"<call>booking_operation(action='{operation}', booking_id='{booking_id}')</call>"
     
     def handle_passenger_lookup(self, user_id: int, **kwargs) -> Dict[str, Any]:
         """
@@ -1233,155 +1688,28 @@ class BookingStorageService:
             
             passengers = []
             
-            with self.storage.conn.cursor() as cur:
-                # Build the main query to search through passenger profiles
-                base_query = """
-                    SELECT DISTINCT
-                        pp.id,
-                        pp.first_name,
-                        pp.middle_name,
-                        pp.last_name,
-                        pp.date_of_birth,
-                        pp.gender,
-                        pp.title,
-                        pp.email,
-                        pp.phone_number,
-                        pp.primary_document_type,
-                        pp.primary_document_number,
-                        pp.primary_document_expiry,
-                        pp.primary_document_country,
-                        pp.nationality,
-                        pp.seat_preference,
-                        pp.meal_preference,
-                        pp.special_assistance,
-                        pp.medical_conditions,
-                        pp.dietary_restrictions,
-                        pp.airline_loyalties,
-                        pp.tsa_precheck_number,
-                        pp.global_entry_number,
-                        pp.created_by_user_id,
-                        pp.is_verified,
-                        pp.verification_method,
-                        pp.created_at,
-                        pp.updated_at,
-                        pp.last_traveled_at,
-                        upc.relationship,
-                        upc.connection_type,
-                        upc.trust_level,
-                        upc.can_book_for_passenger,
-                        upc.can_modify_passenger_details,
-                        upc.can_view_passenger_history,
-                        COUNT(bp.id) as booking_count,
-                        MAX(b.created_at) as last_booking_date
-                    FROM passenger_profiles pp
-                    LEFT JOIN user_passenger_connections upc ON pp.id = upc.passenger_id AND upc.user_id = %s
-                    LEFT JOIN booking_passengers bp ON pp.id = bp.passenger_profile_id
-                    LEFT JOIN bookings b ON bp.booking_id = b.id AND b.primary_user_id = %s
-                    WHERE (
-                        pp.created_by_user_id = %s
-                        OR upc.user_id = %s
-                    )
-                """
-                
-                query_params = [user_id, user_id, user_id, user_id]
-                conditions = []
-                
-                # Add booking ID filter if specified
+            with self.storage.cursor() as cur:
+                # Partial matching wraps the names in wildcards; exact matching still
+                # uses ILIKE so it stays case-insensitive. Both forms are served by the
+                # pg_trgm indexes on passenger_profiles names
+                name_patterns = [
+                    f"%{name}%" if partial_match else name
+                    for name in (first_name, last_name) if name
+                ]
+                key = (bool(booking_id), bool(first_name), bool(last_name), not include_connections)
+                statement_name, statement = _PASSENGER_LOOKUP_STATEMENTS[key]
+                params = [user_id, limit]
                 if booking_id:
-                    conditions.append("b.id = %s")
-                    query_params.append(booking_id)
-                
-                # Add name filters
-                if first_name:
-                    if partial_match:
-                        conditions.append("pp.first_name ILIKE %s")
-                        query_params.append(f"%{first_name}%") # type: ignore
-                    else:
-                        conditions.append("pp.first_name ILIKE %s")
-                        query_params.append(first_name)
-                
-                if last_name:
-                    if partial_match:
-                        conditions.append("pp.last_name ILIKE %s")
-                        query_params.append(f"%{last_name}%") # type: ignore
-                    else:
-                        conditions.append("pp.last_name ILIKE %s")
-                        query_params.append(last_name)
-                
-                # If we don't want connections, only include profiles created by this user
-                if not include_connections:
-                    conditions.append("pp.created_by_user_id = %s")
-                    query_params.append(user_id)
-                
-                # Add conditions to query
-                if conditions:
-                    base_query += " AND " + " AND ".join(conditions)
+                    params.append(booking_id)
+                params.extend(name_patterns)
+                execute_prepared(cur, statement_name, statement, tuple(params))
                 
-                # Add grouping, ordering and limit
-                base_query += """
-                    GROUP BY pp.id, upc.relationship, upc.connection_type, upc.trust_level,
-                            upc.can_book_for_passenger, upc.can_modify_passenger_details, 
-                            upc.can_view_passenger_history
-                    ORDER BY 
-                        CASE 
-                            WHEN pp.created_by_user_id = %s THEN 1  -- Own profiles first
-                            WHEN upc.relationship = 'self' THEN 2  -- Self connections next
-                            WHEN upc.relationship IN ('spouse', 'partner', 'child', 'parent') THEN 3  -- Family next
-                            WHEN upc.trust_level = 'high' THEN 4  -- High trust connections
-                            ELSE 5
-                        END,
-                        booking_count DESC NULLS LAST,  -- Most frequently booked
-                        pp.last_traveled_at DESC NULLS LAST,  -- Most recently traveled
-                        last_booking_date DESC NULLS LAST  -- Most recent booking
-                    LIMIT %s
-                """
-                query_params.extend([user_id, limit])
-                
-                # Execute the query
-                cur.execute(base_query, query_params)
-                rows = cur.fetchall()
-                
-                # Convert rows to PassengerProfile objects
-                for row in rows:
-                    # Parse airline_loyalties JSON
-                    airline_loyalties = {}
-                    if row[19]:  # airline_loyalties field
-                        try:
-                            airline_loyalties = json.loads(row[19]) if isinstance(row[19], str) else row[19]
-                        except (json.JSONDecodeError, TypeError):
-                            airline_loyalties = {}
-                    
-                    # Create PassengerProfile object
-                    profile = PassengerProfile(
-                        id=row[0],
-                        first_name=row[1] or "",
-                        middle_name=row[2],
-                        last_name=row[3] or "",
-                        date_of_birth=row[4],
-                        gender=row[5],
-                        title=row[6],
-                        email=row[7],
-                        phone_number=row[8],
-                        primary_document_type=row[9],
-                        primary_document_number=row[10],
-                        primary_document_expiry=row[11],
-                        primary_document_country=row[12],
-                        nationality=row[13],
-                        seat_preference=row[14] or "any",
-                        meal_preference=row[15],
-                        special_assistance=row[16],
-                        medical_conditions=row[17],
-                        dietary_restrictions=row[18],
-                        airline_loyalties=airline_loyalties,
-                        tsa_precheck_number=row[20],
-                        global_entry_number=row[21],
-                        created_by_user_id=row[22],
-                        is_verified=bool(row[23]),
-                        verification_method=row[24],
-                        created_at=row[25],
-                        updated_at=row[26],
-                        last_traveled_at=row[27]
-                    )
+                # Convert rows to PassengerProfile objects, iterating the cursor directly
+                # so no intermediate list of row tuples is built
+                for row in cur:
+                    # Defaults were applied in SQL, so the profile columns map onto
+                    # the dataclass positionally
+                    profile = PassengerProfile(*row[:_PASSENGER_PROFILE_WIDTH])
                     
                     # Add connection metadata
                     connection_info = {
@@ -1395,21 +1723,18 @@ class BookingStorageService:
                         "last_booking_date": row[35].isoformat() if row[35] else None
                     }
                     
-                    # Calculate completeness score
-                    required_fields = [
-                        profile.first_name, profile.last_name, profile.date_of_birth, 
+                    # Calculate completeness score: 2 per required field, 1 per optional
+                    # one (seat_preference is never empty, SQL defaults it to "any")
+                    completeness_score = 2 * sum(map(bool, (
+                        profile.first_name, profile.last_name, profile.date_of_birth,
                         profile.nationality, profile.primary_document_number
-                    ]
-                    optional_fields = [
-                        profile.seat_preference and profile.seat_preference != "any",
+                    ))) + sum(map(bool, (
+                        profile.seat_preference != "any",
                         profile.meal_preference,
                         profile.primary_document_expiry,
                         profile.email,
                         profile.phone_number
-                    ]
-                    
-                    completeness_score = sum(2 for field in required_fields if field) + \
-                                    sum(1 for field in optional_fields if field)
+                    )))
                     
                     passenger_data = {
                         "profile": profile,
@@ -1450,9 +1775,7 @@ class BookingStorageService:
             return response
             
         except Exception as e:
-            print(f"Error in handle_passenger_lookup: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Passenger lookup failed for user %s", user_id)
             return {"error": f"Passenger lookup failed: {str(e)}"}
 
 
@@ -1477,38 +1800,13 @@ class BookingStorageService:
             
             suggestions = []
             
-            with self.storage.conn.cursor() as cur:
-                # Search for passengers in user's connections
-                cur.execute("""
+            with self.storage.cursor() as cur:
+                # Search for passengers in user's connections. Any substring of the first
+                # or last name is also a substring of the full name, so one trigram-indexed
+                # match on the full name covers all three
+                cur.execute(f"""
                     SELECT 
-                        pp.id,
-                        pp.first_name,
-                        pp.middle_name,
-                        pp.last_name,
-                        pp.date_of_birth,
-                        pp.gender,
-                        pp.title,
-                        pp.email,
-                        pp.phone_number,
-                        pp.primary_document_type,
-                        pp.primary_document_number,
-                        pp.primary_document_expiry,
-                        pp.primary_document_country,
-                        pp.nationality,
-                        pp.seat_preference,
-                        pp.meal_preference,
-                        pp.special_assistance,
-                        pp.medical_conditions,
-                        pp.dietary_restrictions,
-                        pp.airline_loyalties,
-                        pp.tsa_precheck_number,
-                        pp.global_entry_number,
-                        pp.created_by_user_id,
-                        pp.is_verified,
-                        pp.verification_method,
-                        pp.created_at,
-                        pp.updated_at,
-                        pp.last_traveled_at,
+                        {_PASSENGER_PROFILE_SELECT_LIST},
                         upc.relationship,
                         COUNT(b.id) as booking_count,
                         MAX(b.created_at) as last_booking
@@ -1519,60 +1817,20 @@ class BookingStorageService:
                     WHERE (
                         pp.created_by_user_id = %s 
                         OR upc.user_id = %s
-                    ) AND (
-                        pp.first_name ILIKE %s
-                        OR pp.last_name ILIKE %s
-                        OR CONCAT(pp.first_name, ' ', pp.last_name) ILIKE %s
-                    )
+                    ) AND (pp.first_name || ' ' || pp.last_name) ILIKE %s
                     GROUP BY pp.id, upc.relationship
                     ORDER BY booking_count DESC, last_booking DESC
                     LIMIT %s
                 """, (
                     user_id, user_id, user_id, user_id,
-                    f"%{partial_name}%", f"%{partial_name}%", f"%{partial_name}%",
+                    f"%{partial_name}%",
                     limit
                 ))
                 
-                for row in cur.fetchall():
-                    # Parse airline_loyalties JSON
-                    airline_loyalties = {}
-                    if row[19]:  # airline_loyalties field
-                        try:
-                            airline_loyalties = json.loads(row[19]) if isinstance(row[19], str) else row[19]
-                        except (json.JSONDecodeError, TypeError):
-                            airline_loyalties = {}
-                    
-                    # Create PassengerProfile object
-                    profile = PassengerProfile(
-                        id=row[0],
-                        first_name=row[1] or "",
-                        middle_name=row[2],
-                        last_name=row[3] or "",
-                        date_of_birth=row[4],
-                        gender=row[5],
-                        title=row[6],
-                        email=row[7],
-                        phone_number=row[8],
-                        primary_document_type=row[9],
-                        primary_document_number=row[10],
-                        primary_document_expiry=row[11],
-                        primary_document_country=row[12],
-                        nationality=row[13],
-                        seat_preference=row[14] or "any",
-                        meal_preference=row[15],
-                        special_assistance=row[16],
-                        medical_conditions=row[17],
-                        dietary_restrictions=row[18],
-                        airline_loyalties=airline_loyalties,
-                        tsa_precheck_number=row[20],
-                        global_entry_number=row[21],
-                        created_by_user_id=row[22],
-                        is_verified=bool(row[23]),
-                        verification_method=row[24],
-                        created_at=row[25],
-                        updated_at=row[26],
-                        last_traveled_at=row[27]
-                    )
+                for row in cur:
+                    # Defaults were applied in SQL, so the profile columns map onto
+                    # the dataclass positionally
+                    profile = PassengerProfile(*row[:_PASSENGER_PROFILE_WIDTH])
                     
                     suggestion = {
                         "profile": profile,
@@ -1611,10 +1869,11 @@ class BookingStorageService:
             if not self.storage.conn:
                 return {"error": "Database connection not available"}
             
-            with self.storage.conn.cursor() as cur:
+            with self.storage.cursor() as cur:
                 # First verify user has access to this passenger
-                cur.execute("""
-                    SELECT pp.*, upc.relationship, upc.connection_type, upc.trust_level
+                cur.execute(f"""
+                    SELECT {_PASSENGER_PROFILE_SELECT_LIST},
+                        upc.relationship, upc.connection_type, upc.trust_level
                     FROM passenger_profiles pp
                     LEFT JOIN user_passenger_connections upc ON pp.id = upc.passenger_id AND upc.user_id = %s
                     WHERE pp.id = %s AND (
@@ -1645,45 +1904,7 @@ class BookingStorageService:
                 
                 stats_row = cur.fetchone()
                 
-                # Parse airline_loyalties JSON
-                airline_loyalties = {}
-                if passenger_row[19]:  # airline_loyalties field
-                    try:
-                        airline_loyalties = json.loads(passenger_row[19]) if isinstance(passenger_row[19], str) else passenger_row[19]
-                    except (json.JSONDecodeError, TypeError):
-                        airline_loyalties = {}
-                
-                # Create PassengerProfile object
-                profile = PassengerProfile(
-                    id=passenger_row[0],
-                    first_name=passenger_row[1] or "",
-                    middle_name=passenger_row[2],
-                    last_name=passenger_row[3] or "",
-                    date_of_birth=passenger_row[4],
-                    gender=passenger_row[5],
-                    title=passenger_row[6],
-                    email=passenger_row[7],
-                    phone_number=passenger_row[8],
-                    primary_document_type=passenger_row[9],
-                    primary_document_number=passenger_row[10],
-                    primary_document_expiry=passenger_row[11],
-                    primary_document_country=passenger_row[12],
-                    nationality=passenger_row[13],
-                    seat_preference=passenger_row[14] or "any",
-                    meal_preference=passenger_row[15],
-                    special_assistance=passenger_row[16],
-                    medical_conditions=passenger_row[17],
-                    dietary_restrictions=passenger_row[18],
-                    airline_loyalties=airline_loyalties,
-                    tsa_precheck_number=passenger_row[20],
-                    global_entry_number=passenger_row[21],
-                    created_by_user_id=passenger_row[22],
-                    is_verified=bool(passenger_row[23]),
-                    verification_method=passenger_row[24],
-                    created_at=passenger_row[25],
-                    updated_at=passenger_row[26],
-                    last_traveled_at=passenger_row[27]
-                )
+                profile = PassengerProfile(*passenger_row[:_PASSENGER_PROFILE_WIDTH])
                 
                 if not stats_row or not stats_row[0]:
                     stats = {
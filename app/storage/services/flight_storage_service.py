@@ -6,7 +6,7 @@ import json
 from dataclasses import dataclass
 from datetime import datetime, date, timedelta
 from decimal import Decimal
-from app.storage.db_service import StorageService
+from app.storage.db_service import StorageService, decode_json_column
 import uuid
 
 @dataclass
@@ -155,11 +155,11 @@ class FlightStorageService:
                         user_id=row[1],
                         custom_search_id=row[2],
                         search_type=row[3],
-                        search_params=json.loads(row[4]) if row[4] else {},
-                        raw_results=json.loads(row[5]) if row[5] else [],
-                        processed_results=json.loads(row[6]) if row[6] else [],
+                        search_params=decode_json_column(row[4], {}),
+                        raw_results=decode_json_column(row[5], []),
+                        processed_results=decode_json_column(row[6], []),
                         result_count=row[7],
-                        apis_used=json.loads(row[8]) if row[8] else [],
+                        apis_used=decode_json_column(row[8], []),
                         search_duration_ms=row[9],
                         cache_hit=row[10],
                         created_at=row[11],
@@ -193,10 +193,10 @@ class FlightStorageService:
                 if row:
                     return FlightSearch(
                         id=row[0], user_id=row[1], custom_search_id=row[2],
-                        search_type=row[3], search_params=json.loads(row[4]) if row[4] else {},
-                        raw_results=json.loads(row[5]) if row[5] else [],
-                        processed_results=json.loads(row[6]) if row[6] else [],
-                        result_count=row[7], apis_used=json.loads(row[8]) if row[8] else [],
+                        search_type=row[3], search_params=decode_json_column(row[4], {}),
+                        raw_results=decode_json_column(row[5], []),
+                        processed_results=decode_json_column(row[6], []),
+                        result_count=row[7], apis_used=decode_json_column(row[8], []),
                         search_duration_ms=row[9], cache_hit=row[10], created_at=row[11],
                         expires_at=row[12], accessed_at=row[13], access_count=row[14]
                     )
@@ -247,10 +247,10 @@ class FlightStorageService:
                 return [
                     FlightSearch(
                         id=row[0], user_id=row[1], custom_search_id=row[2],
-                        search_type=row[3], search_params=json.loads(row[4]) if row[4] else {},
-                        raw_results=json.loads(row[5]) if row[5] else [],
-                        processed_results=json.loads(row[6]) if row[6] else [],
-                        result_count=row[7], apis_used=json.loads(row[8]) if row[8] else [],
+                        search_type=row[3], search_params=decode_json_column(row[4], {}),
+                        raw_results=decode_json_column(row[5], []),
+                        processed_results=decode_json_column(row[6], []),
+                        result_count=row[7], apis_used=decode_json_column(row[8], []),
                         search_duration_ms=row[9], cache_hit=row[10], created_at=row[11],
                         expires_at=row[12], accessed_at=row[13], access_count=row[14]
                     )
@@ -346,12 +346,12 @@ class FlightStorageService:
                         id=row[0], search_id=row[1], flight_offer_id=row[2],
                         amadeus_offer_id=row[3], base_price=row[4], taxes_and_fees=row[5],
                         total_price=row[6], currency=row[7],
-                        airline_codes=json.loads(row[8]) if row[8] else [],
+                        airline_codes=decode_json_column(row[8], []),
                         route_summary=row[9], total_duration_minutes=row[10],
                         stops_count=row[11], bookable_until=row[12],
                         seats_available=row[13],
-                        fare_rules=json.loads(row[14]) if row[14] else {},
-                        complete_offer_data=json.loads(row[15]) if row[15] else {},
+                        fare_rules=decode_json_column(row[14], {}),
+                        complete_offer_data=decode_json_column(row[15], {}),
                         created_at=row[16]
                     )
                     for row in cur.fetchall()
@@ -383,12 +383,12 @@ class FlightStorageService:
                         id=row[0], search_id=row[1], flight_offer_id=row[2],
                         amadeus_offer_id=row[3], base_price=row[4], taxes_and_fees=row[5],
                         total_price=row[6], currency=row[7],
-                        airline_codes=json.loads(row[8]) if row[8] else [],
+                        airline_codes=decode_json_column(row[8], []),
                         route_summary=row[9], total_duration_minutes=row[10],
                         stops_count=row[11], bookable_until=row[12],
                         seats_available=row[13],
-                        fare_rules=json.loads(row[14]) if row[14] else {},
-                        complete_offer_data=json.loads(row[15]) if row[15] else {},
+                        fare_rules=decode_json_column(row[14], {}),
+                        complete_offer_data=decode_json_column(row[15], {}),
                         created_at=row[16]
                     )
                 return None
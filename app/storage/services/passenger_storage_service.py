@@ -2,12 +2,12 @@
 # app/storage/services/passenger_storage_service.py
 # ==============================================================================
 from typing import Dict, Any, List, Optional, Tuple
-import json
 from dataclasses import dataclass
 from datetime import datetime, date
-from app.storage.db_service import StorageService
+from app.storage.db_service import StorageService, decode_json_column, json_dumps
 
-@dataclass
+
+@dataclass(slots=True)
 class PassengerProfile:
     id: str
     first_name: str
@@ -38,7 +38,7 @@ class PassengerProfile:
     updated_at: datetime
     last_traveled_at: Optional[datetime]
 
-@dataclass
+@dataclass(slots=True)
 class PassengerDocument:
     id: str
     passenger_id: str
@@ -52,7 +52,7 @@ class PassengerDocument:
     created_at: datetime
     updated_at: datetime
 
-@dataclass
+@dataclass(slots=True)
 class UserPassengerConnection:
     id: int
     user_id: int
@@ -118,7 +118,7 @@ class PassengerStorageService:
                 
                 # Handle JSON fields
                 if 'airline_loyalties' in passenger_data:
-                    insert_data['airline_loyalties'] = json.dumps(passenger_data['airline_loyalties'])
+                    insert_data['airline_loyalties'] = json_dumps(passenger_data['airline_loyalties'])
                 
                 # Build query
                 fields = list(insert_data.keys())
@@ -172,7 +172,7 @@ class PassengerStorageService:
                         nationality=row[13], seat_preference=row[14], meal_preference=row[15],
                         special_assistance=row[16], medical_conditions=row[17],
                         dietary_restrictions=row[18],
-                        airline_loyalties=json.loads(row[19]) if row[19] else {},
+                        airline_loyalties=decode_json_column(row[19], {}),
                         tsa_precheck_number=row[20], global_entry_number=row[21],
                         created_by_user_id=row[22], is_verified=row[23],
                         verification_method=row[24], created_at=row[25],
@@ -212,7 +212,7 @@ class PassengerStorageService:
                     if key in valid_fields:
                         if key in json_fields:
                             update_fields.append(f"{key} = %s")
-                            update_values.append(json.dumps(value))
+                            update_values.append(json_dumps(value))
                         else:
                             update_fields.append(f"{key} = %s")
                             update_values.append(value)
@@ -282,7 +282,7 @@ class PassengerStorageService:
                         nationality=row[13], seat_preference=row[14], meal_preference=row[15],
                         special_assistance=row[16], medical_conditions=row[17],
                         dietary_restrictions=row[18],
-                        airline_loyalties=json.loads(row[19]) if row[19] else {},
+                        airline_loyalties=decode_json_column(row[19], {}),
                         tsa_precheck_number=row[20], global_entry_number=row[21],
                         created_by_user_id=row[22], is_verified=row[23],
                         verification_method=row[24], created_at=row[25],
@@ -316,7 +316,7 @@ class PassengerStorageService:
                 
                 # Handle document images
                 if 'document_image_ids' in document_data:
-                    insert_data['document_image_ids'] = json.dumps(document_data['document_image_ids'])
+                    insert_data['document_image_ids'] = json_dumps(document_data['document_image_ids'])
                 
                 # Build query
                 fields = list(insert_data.keys())
@@ -361,7 +361,7 @@ class PassengerStorageService:
                         id=row[0], passenger_id=row[1], document_type=row[2],
                         document_number=row[3], document_expiry=row[4],
                         issuing_country=row[5],
-                        document_image_ids=json.loads(row[6]) if row[6] else [],
+                        document_image_ids=decode_json_column(row[6], []),
                         is_primary=row[7], is_verified=row[8],
                         created_at=row[9], updated_at=row[10]
                     )
@@ -465,7 +465,7 @@ class PassengerStorageService:
                         nationality=row[13], seat_preference=row[14], meal_preference=row[15],
                         special_assistance=row[16], medical_conditions=row[17],
                         dietary_restrictions=row[18],
-                        airline_loyalties=json.loads(row[19]) if row[19] else {},
+                        airline_loyalties=decode_json_column(row[19], {}),
                         tsa_precheck_number=row[20], global_entry_number=row[21],
                         created_by_user_id=row[22], is_verified=row[23],
                         verification_method=row[24], created_at=row[25],
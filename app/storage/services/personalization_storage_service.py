@@ -5,7 +5,7 @@ from typing import Dict, Any, List, Optional
 import json
 import hashlib
 from dataclasses import dataclass
-from app.storage.db_service import StorageService
+from app.storage.db_service import StorageService, decode_json_column
 
 @dataclass
 class UserPreferences:
@@ -69,15 +69,15 @@ class PersonalizationStorageService:
                 if row:
                     return UserPreferences(
                         user_id=row[0],
-                        preferred_airlines=json.loads(row[1]) if row[1] else [],
-                        preferred_departure_times=json.loads(row[2]) if row[2] else {},
+                        preferred_airlines=decode_json_column(row[1], []),
+                        preferred_departure_times=decode_json_column(row[2], {}),
                         preferred_seat_type=row[3],
-                        budget_range=json.loads(row[4]) if row[4] else {},
+                        budget_range=decode_json_column(row[4], {}),
                         typical_advance_booking_days=row[5],
                         prefers_direct_flights=row[6],
                         price_sensitivity=row[7] or 'medium',
-                        frequently_searched_routes=json.loads(row[8]) if row[8] else [],
-                        booking_patterns=json.loads(row[9]) if row[9] else {},
+                        frequently_searched_routes=decode_json_column(row[8], []),
+                        booking_patterns=decode_json_column(row[9], {}),
                         updated_at=row[10],
                         created_at=row[11]
                     )
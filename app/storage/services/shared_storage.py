@@ -32,6 +32,12 @@ class SharedStorageService:
             cache_data, 
             ttl=ttl_minutes * 60
         )
+        # The params alone, so callers that only need them skip decoding the results
+        self.redis_manager.set_data(
+            f"search_params:{user_id}:{search_id}",
+            search_params,
+            ttl=ttl_minutes * 60
+        )
         
         return search_id
     
@@ -39,6 +45,16 @@ class SharedStorageService:
         """Get cached search results"""
         return self.redis_manager.get_data(f"search:{user_id}:{search_id}")
     
+    def get_cached_search_params(self, user_id: int, search_id: str) -> Optional[Dict[str, Any]]:
+        """Get the parameters of a cached search without loading its results"""
+        search_params = self.redis_manager.get_data(f"search_params:{user_id}:{search_id}")
+        if search_params is not None:
+            return search_params
+        
+        # Searches cached before params were stored separately
+        search_data = self.get_cached_search(user_id, search_id)
+        return search_data.get('search_params', {}) if search_data else None
+    
     def _generate_search_id(self, user_id: int, search_params: Dict[str, Any]) -> str:
         """Generate unique search ID"""
         import hashlib
@@ -7,7 +7,7 @@ import secrets
 import logging
 from dataclasses import dataclass
 from datetime import datetime, date, timedelta
-from app.storage.db_service import StorageService
+from app.storage.db_service import StorageService, decode_json_column
 
 @dataclass
 class User:
@@ -326,7 +326,7 @@ class UserStorageService:
                         user_id=row[1],
                         session_token=row[2],
                         expires_at=row[3],
-                        device_info=json.loads(row[4]) if row[4] else None,
+                        device_info=decode_json_column(row[4], None),
                         ip_address=row[5],
                         created_at=row[6]
                     )
@@ -387,8 +387,8 @@ class UserStorageService:
             onboarding_completed_at=row[12],
             is_trusted_tester=row[13],
             is_active=row[14],
-            travel_preferences=json.loads(row[15]) if row[15] else {},
-            notification_preferences=json.loads(row[16]) if row[16] else {},
+            travel_preferences=decode_json_column(row[15], {}),
+            notification_preferences=decode_json_column(row[16], {}),
             created_at=row[17],
             updated_at=row[18],
             last_chat_at=row[19]
@@ -0,0 +1,32 @@
+# ==============================================================================
+# tests/services/api/flights/test_flight_service.py
+# ==============================================================================
+import re
+import pytest
+from unittest.mock import patch
+from app.services.api.flights.flight_service import FlightService
+
+class TestGenerateBookingReference:
+    
+    @pytest.fixture
+    def flight_service(self):
+        """Flight service without providers; reference generation needs none"""
+        return FlightService.__new__(FlightService)
+    
+    def test_reference_format(self, flight_service):
+        """Test references are 3 letters, 3 digits and 2 letters"""
+        for _ in range(200):
+            assert re.fullmatch(r'[A-Z]{3}[0-9]{3}[A-Z]{2}', flight_service._generate_booking_reference())
+    
+    @patch('app.services.api.flights.flight_service.os.urandom')
+    def test_reference_from_random_bytes(self, mock_urandom, flight_service):
+        """Test each random byte maps onto its letter or digit position"""
+        # Arrange
+        mock_urandom.return_value = bytes([0, 1, 25, 0, 9, 255, 26, 255])
+        
+        # Act
+        result = flight_service._generate_booking_reference()
+        
+        # Assert
+        assert result == 'ABZ095AV'
+        mock_urandom.assert_called_once_with(8)
@@ -0,0 +1,53 @@
+# ==============================================================================
+# tests/services/modelling/test_tool_executor_service.py
+# ==============================================================================
+import pytest
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from app.services.modelling.tool_executor_service import ToolExecutorService
+
+class Cabin(Enum):
+    ECONOMY = "economy"
+
+@dataclass
+class Fare:
+    amount: Decimal
+    cabin: Cabin
+    departs_at: datetime
+
+class TestFormatToolResultsForModel:
+    
+    @pytest.fixture
+    def executor(self):
+        """Tool executor with default settings"""
+        return ToolExecutorService()
+    
+    def test_serializes_dataclass_datetime_decimal_and_enum(self, executor):
+        """Test that rich result types go through the custom serializer"""
+        # Arrange
+        fare = Fare(amount=Decimal('199.50'), cabin=Cabin.ECONOMY, departs_at=datetime(2025, 3, 1, 8, 30))
+        results = [{"tool_name": "search_flights", "success": True, "result": {"fares": [fare], "currency": "USD"}}]
+        
+        # Act
+        output = executor.format_tool_results_for_model(results)
+        
+        # Assert
+        assert '<output>{"fares":[{"amount":199.5,"cabin":"economy","departs_at":"2025-03-01T08:30:00"}],"currency":"USD"}</output>' in output
+    
+    def test_serializes_plain_object_attributes(self, executor):
+        """Test that objects without a dataclass fall back to their attributes"""
+        # Arrange
+        class Seat:
+            def __init__(self):
+                self.number = "12A"
+                self.cabin = Cabin.ECONOMY
+                self.held_until = datetime(2025, 3, 1, 9, 0)
+        results = [{"tool_name": "hold_seat", "success": True, "result": Seat()}]
+        
+        # Act
+        output = executor.format_tool_results_for_model(results)
+        
+        # Assert
+        assert '<output>{"number":"12A","cabin":"economy","held_until":"2025-03-01T09:00:00"}</output>' in output
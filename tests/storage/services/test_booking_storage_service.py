@@ -8,8 +8,9 @@ from unittest.mock import Mock, MagicMock, patch
 from datetime import datetime, date
 from decimal import Decimal
 from app.storage.services.booking_storage_service import (
-    BookingStorageService, Booking, BookingPassenger, BookingFlightSegment, BookingTimelineEvent
+    BookingStorageService, Booking, BookingFlightSegment, BookingTimelineEvent
 )
+from app.services.api.flights.flight_service import FlightService
 
 class TestBookingStorageService:
     
@@ -18,6 +19,8 @@ class TestBookingStorageService:
         """Mock storage service"""
         storage = Mock()
         storage.conn = MagicMock()
+        # StorageService.cursor() opens its cursor on the connection
+        storage.cursor = storage.conn.cursor
         return storage
     
     @pytest.fixture
@@ -74,12 +77,18 @@ class TestBookingStorageService:
         
         # Assert
         assert result == 'booking-uuid-123'
-        assert mock_cursor.execute.call_count == 2  # INSERT booking + INSERT timeline
-        
-        # Verify booking insert
-        first_call = mock_cursor.execute.call_args_list[0][0]
-        assert "INSERT INTO bookings" in first_call[0]
-        assert "RETURNING id" in first_call[0]
+        assert mock_cursor.execute.call_count == 2  # PREPARE + EXECUTE
+        
+        # Verify booking insert, which also records the creation event
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert prepare_sql.startswith("PREPARE create_booking_")
+        assert "INSERT INTO bookings" in prepare_sql
+        assert "'booking_created'" in prepare_sql
+        assert "RETURNING id" in prepare_sql
+        
+        # Only the supplied columns are bound; the rest take their schema defaults
+        execute_params = mock_cursor.execute.call_args_list[1][0][1]
+        assert execute_params == (123, 'round_trip', 'NYC', 'LAX', date(2024, 6, 15), Decimal('299.99'))
     
     def test_create_booking_generates_reference(self, booking_service, mock_storage):
         """Test that booking reference is generated if not provided"""
@@ -93,9 +102,54 @@ class TestBookingStorageService:
         
         # Assert
         assert result == 'booking-uuid-123'
-        # Verify that booking_reference was added to the query
-        insert_call = mock_cursor.execute.call_args_list[0]
-        assert 'booking_reference' in insert_call[0][0]
+        # Verify that the booking reference is left to the column default
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert 'INSERT INTO bookings (primary_user_id)' in prepare_sql
+        assert mock_cursor.execute.call_args_list[1][0][1] == (123,)
+    
+    def test_create_booking_retries_reference_collision(self, booking_service, mock_storage):
+        """Test that a generated reference collision runs the insert again"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.side_effect = [None, ['booking-uuid-123']]
+        
+        # Act
+        result = booking_service.create_booking(primary_user_id=123)
+        
+        # Assert
+        assert result == 'booking-uuid-123'
+        assert mock_cursor.execute.call_count == 3  # PREPARE once, EXECUTE twice
+    
+    def test_create_booking_with_reference_collision(self, booking_service, mock_storage):
+        """Test that a caller-provided reference is not retried on collision"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = None
+        
+        # Act
+        result = booking_service.create_booking(primary_user_id=123, booking_reference='ABC123DE')
+        
+        # Assert
+        assert result is None
+        assert mock_cursor.execute.call_count == 2
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert 'INSERT INTO bookings (booking_reference, primary_user_id)' in prepare_sql
+        assert mock_cursor.execute.call_args_list[1][0][1] == ('ABC123DE', 123)
+    
+    def test_create_booking_rejects_unknown_fields(self, booking_service, mock_storage):
+        """Test that fields which are not bookings columns are refused"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        
+        # Act
+        result = booking_service.create_booking(primary_user_id=123, amadeus_pnr='PNR123')
+        
+        # Assert
+        assert result is None
+        mock_cursor.execute.assert_not_called()
     
     def test_get_booking_success(self, booking_service, mock_storage):
         """Test successful booking retrieval"""
@@ -184,7 +238,7 @@ class TestBookingStorageService:
         update_data = {
             'total_amount': Decimal('350.00'),
             'booking_status': 'confirmed',
-            'amadeus_pnr': 'PNR123ABC'
+            'provider_pnr': 'PNR123ABC'
         }
         
         # Act
@@ -194,28 +248,315 @@ class TestBookingStorageService:
         assert result is True
         
         # Verify update query
-        execute_call = mock_cursor.execute.call_args[0]
-        assert "UPDATE bookings" in execute_call[0]
-        assert "updated_at = CURRENT_TIMESTAMP" in execute_call[0]
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "UPDATE bookings" in prepare_sql
+        assert "updated_at = CURRENT_TIMESTAMP" in prepare_sql
+        
+        # Fields are bound in sorted order, followed by the booking ID
+        execute_params = mock_cursor.execute.call_args_list[1][0][1]
+        assert execute_params == ('confirmed', 'PNR123ABC', Decimal('350.00'), 'booking-123')
+    
+    def test_update_booking_rejects_unknown_fields(self, booking_service, mock_storage):
+        """Test that fields which are not bookings columns are refused"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        
+        # Act
+        result = booking_service.update_booking('booking-123', {'status': 'confirmed'})
+        
+        # Assert
+        assert result is False
+        mock_cursor.execute.assert_not_called()
+    
+    def test_update_booking_if_owner_success(self, booking_service, mock_storage):
+        """Test that an owned booking is updated without an ownership lookup"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.rowcount = 1
+        
+        # Act
+        result = booking_service.update_booking_if_owner('booking-123', 456, {'special_requests': 'Window seat'})
+        
+        # Assert
+        assert result is None
+        assert mock_cursor.execute.call_count == 2  # PREPARE + EXECUTE of the UPDATE
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "primary_user_id = $3" in prepare_sql
+        assert mock_cursor.execute.call_args_list[1][0][1] == ('Window seat', 'booking-123', 456)
+    
+    def test_update_booking_if_owner_with_timeline_event(self, booking_service, mock_storage):
+        """Test that the update and its timeline event are written by one statement"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.rowcount = 1
+        timeline_event = {
+            'event_type': 'booking_updated',
+            'event_description': 'Booking details updated: special_requests',
+            'triggered_by_user_id': 456
+        }
+        
+        # Act
+        result = booking_service.update_booking_if_owner('booking-123', 456, {'special_requests': 'Window seat'},
+                                                         timeline_event=timeline_event)
+        
+        # Assert
+        assert result is None
+        assert mock_cursor.execute.call_count == 2  # PREPARE + EXECUTE of the one statement
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "UPDATE bookings" in prepare_sql
+        assert "INSERT INTO booking_timeline" in prepare_sql
+        assert mock_cursor.execute.call_args_list[1][0][1] == (
+            'Window seat', 'booking-123', 456,
+            'booking_updated', 'Booking details updated: special_requests', None, 456, False
+        )
+    
+    def test_update_booking_if_owner_access_denied(self, booking_service, mock_storage):
+        """Test that a booking owned by another user is reported as access denied"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = [999]
+        
+        # Act
+        result = booking_service.update_booking_if_owner('booking-123', 456, {'special_requests': 'Window seat'})
+        
+        # Assert
+        assert result == {"error": "Access denied to this booking"}
+    
+    def test_update_booking_if_owner_not_found(self, booking_service, mock_storage):
+        """Test that a missing booking is reported as not found"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = None
+        
+        # Act
+        result = booking_service.update_booking_if_owner('booking-123', 456, {'special_requests': 'Window seat'})
+        
+        # Assert
+        assert result == {"error": "Booking not found"}
+    
+    def test_update_booking_if_owner_failure_message(self, booking_service, mock_storage):
+        """Test that an owned booking which was not updated returns the failure message"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = [456]
+        
+        # Act
+        result = booking_service.update_booking_if_owner('booking-123', 456, {'special_requests': 'Window seat'},
+                                                         "Failed to add emergency contact information")
+        
+        # Assert
+        assert result == {"error": "Failed to add emergency contact information"}
+    
+    def test_update_booking_if_owner_skip_unchanged(self, booking_service, mock_storage):
+        """Test that re-sending identical values is a no-op success"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.rowcount = 0
+        mock_cursor.fetchone.return_value = [456]
+        
+        # Act
+        result = booking_service.update_booking_if_owner('booking-123', 456, {'special_requests': 'Window seat'},
+                                                         skip_unchanged=True)
+        
+        # Assert
+        assert result['success'] is True
+        assert result['updated_fields'] == []
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "special_requests IS DISTINCT FROM $1" in prepare_sql
     
     def test_update_booking_status_success(self, booking_service, mock_storage):
         """Test successful booking status update"""
         # Arrange
         mock_cursor = MagicMock()
         mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
-        mock_cursor.rowcount = 1  # Successful update
+        mock_cursor.rowcount = 1  # One status event for the one updated booking
         
         # Act
         result = booking_service.update_booking_status('booking-123', 'confirmed', 456)
         
         # Assert
         assert result is True
-        assert mock_cursor.execute.call_count == 2  # UPDATE + timeline INSERT
+        assert mock_cursor.execute.call_count == 2  # PREPARE + EXECUTE
+        
+        # The status change and its timeline event are one statement
+        update_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "UPDATE bookings" in update_sql
+        assert "booking_status = $1" in update_sql
+        assert "'booking_status_updated'" in update_sql
+        assert mock_cursor.execute.call_args_list[1][0][1] == ('confirmed', 'booking-123', 456)
+    
+    def test_update_booking_status_not_found(self, booking_service, mock_storage):
+        """Test that a missing booking reports no update"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.rowcount = 0
         
-        # Verify update query
-        update_call = mock_cursor.execute.call_args_list[0][0]
-        assert "UPDATE bookings" in update_call[0]
-        assert "booking_status = %s" in update_call[0]
+        # Act
+        result = booking_service.update_booking_status('booking-123', 'confirmed', 456)
+        
+        # Assert
+        assert result is False
+    
+    def test_cancel_booking_success(self, booking_service, mock_storage):
+        """Test cancelling a booking that was never placed with a provider"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.side_effect = [
+            (456, 'ABC123DE', 'draft', 'pending', None, None, None, Decimal('305.00'), 'USD'),
+            (datetime(2024, 6, 1, 12, 0),)
+        ]
+        
+        # Act
+        result = booking_service.cancel_booking('booking-123', 456, reason='Change of plans')
+        
+        # Assert
+        assert result.success is True
+        assert result.cancelled_at == '2024-06-01T12:00:00'
+        assert result.total_amount == 305.0
+        assert result.refund_amount == 0.0
+        assert result.steps is None
+        
+        # The booking update and its timeline event are one statement
+        cancel_sql = mock_cursor.execute.call_args_list[2][0][0]
+        assert "UPDATE bookings" in cancel_sql
+        assert "'booking_cancelled'" in cancel_sql
+        cancel_params = mock_cursor.execute.call_args_list[3][0][1]
+        assert cancel_params[0] == 'booking-123'
+        assert cancel_params[1] == 'Booking cancelled: Change of plans'
+        assert cancel_params[3] == 456
+    
+    def test_cancel_booking_with_provider(self, booking_service, mock_storage):
+        """Test that a placed booking is cancelled with its provider by PNR"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.side_effect = [
+            (456, 'ABC123DE', 'confirmed', 'completed', 'amadeus', 'order-789', 'XYZ987',
+             Decimal('305.00'), 'USD'),
+            (datetime(2024, 6, 1, 12, 0),)
+        ]
+        
+        mock_flight_service = Mock(spec=FlightService)
+        mock_flight_service.cancel_booking.return_value = Mock(
+            success=True, refund_amount=Decimal('250.00'), error_message=None
+        )
+        booking_service.flight_service = mock_flight_service
+        
+        # Act
+        result = booking_service.cancel_booking('booking-123', 456, include_steps=True)
+        
+        # Assert
+        assert result.success is True
+        assert result.refund_amount == 250.0
+        mock_flight_service.cancel_booking.assert_called_once_with('XYZ987', 'amadeus')
+        assert result.steps == [
+            {'step': 'provider_cancellation', 'success': True},
+            {'step': 'booking_update', 'success': True}
+        ]
+    
+    def test_cancel_booking_provider_failure(self, booking_service, mock_storage):
+        """Test that the booking is left alone when the provider cancellation fails"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (
+            456, 'ABC123DE', 'confirmed', 'completed', 'amadeus', 'order-789', 'XYZ987',
+            Decimal('305.00'), 'USD'
+        )
+        
+        mock_flight_service = Mock(spec=FlightService)
+        mock_flight_service.cancel_booking.return_value = Mock(
+            success=False, refund_amount=None, error_message='Order already ticketed'
+        )
+        booking_service.flight_service = mock_flight_service
+        
+        # Act
+        result = booking_service.cancel_booking('booking-123', 456)
+        
+        # Assert
+        assert result.success is False
+        assert result.error == "Provider cancellation failed: Order already ticketed"
+        assert mock_cursor.execute.call_count == 2  # Snapshot only, no cancel UPDATE
+    
+    def test_cancel_booking_access_denied(self, booking_service, mock_storage):
+        """Test that another user's booking is not cancelled"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (999, 'ABC123DE', 'draft', 'pending', None, None, None, Decimal('305.00'), 'USD')
+        
+        # Act
+        result = booking_service.cancel_booking('booking-123', 456)
+        
+        # Assert
+        assert result.success is False
+        assert result.error == "Access denied to this booking"
+        assert mock_cursor.execute.call_count == 2  # Snapshot only
+    
+    def test_cancel_booking_already_cancelled(self, booking_service, mock_storage):
+        """Test that a cancelled booking is not cancelled again"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (456, 'ABC123DE', 'cancelled', 'pending', None, None, None, Decimal('305.00'), 'USD')
+        
+        # Act
+        result = booking_service.cancel_booking('booking-123', 456)
+        
+        # Assert
+        assert result.success is False
+        assert result.error == "Booking is already cancelled"
+    
+    def test_cancel_booking_not_found(self, booking_service, mock_storage):
+        """Test cancelling a missing booking"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = None
+        
+        # Act
+        result = booking_service.cancel_booking('booking-123', 456)
+        
+        # Assert
+        assert result.success is False
+        assert result.error == "Booking not found"
+    
+    def test_cancel_booking_no_connection(self, booking_service):
+        """Test that cancelling without a database connection fails before any provider call"""
+        # Arrange
+        booking_service.storage.conn = None
+        booking_service.flight_service = Mock()
+        
+        # Act
+        result = booking_service.cancel_booking('booking-123', 456)
+        
+        # Assert
+        assert result.success is False
+        assert result.error == "Database not available"
+        booking_service.flight_service.cancel_booking.assert_not_called()
+    
+    def test_handle_cancel_booking_database_error(self, booking_service, mock_storage):
+        """Test that a database error during cancellation comes back as a tool error"""
+        # Arrange
+        mock_storage.conn.cursor.side_effect = Exception("connection lost")
+        
+        # Act
+        result = booking_service._handle_cancel_booking(456, booking_id='booking-123')
+        
+        # Assert
+        assert result == {"error": "Cancel booking failed: connection lost"}
     
     def test_get_booking_details_success(self, booking_service, mock_storage):
         """Test comprehensive booking details retrieval"""
@@ -812,15 +1153,13 @@ class TestBookingStorageService:
     # FLIGHT SEGMENT MANAGEMENT TESTS
     # ====================================================================
     
-    def test_add_flight_segment_success(self, booking_service, mock_storage):
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_add_flight_segment_success(self, mock_execute_values, booking_service, mock_storage):
         """Test adding flight segment to booking"""
         # Arrange
         mock_cursor = MagicMock()
         mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
-        mock_cursor.fetchone.side_effect = [
-            [1],  # Next segment sequence
-            ['segment-uuid-123']  # Inserted segment ID
-        ]
+        mock_execute_values.return_value = [('segment-uuid-123',)]
         
         segment_data = {
             'flight_offer_id': 'offer-123',
@@ -839,7 +1178,49 @@ class TestBookingStorageService:
         
         # Assert
         assert result == 'segment-uuid-123'
-        assert mock_cursor.execute.call_count == 2  # SELECT sequence + INSERT segment
+        mock_execute_values.assert_called_once()  # Sequence lookup rides along in the INSERT
+        
+        row = mock_execute_values.call_args[0][2][0]
+        assert row[:3] == ('booking-123', 'booking-123', 1)
+        assert 'AA1234' in row
+    
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_add_flight_segments_single_insert(self, mock_execute_values, booking_service, mock_storage):
+        """Test adding several flight segments with one INSERT, IDs in order"""
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        mock_execute_values.return_value = [('segment-1',), ('segment-2',)]
+        
+        segments = [
+            {'flight_offer_id': 'offer-123', 'flight_number': 'AA1234'},
+            {'flight_offer_id': 'offer-123', 'flight_number': 'AA4321', 'segment_type': 'return'}
+        ]
+        
+        # Act
+        result = booking_service.add_flight_segments('booking-123', segments)
+        
+        # Assert
+        assert result == ['segment-1', 'segment-2']
+        mock_execute_values.assert_called_once()
+        
+        args, kwargs = mock_execute_values.call_args
+        rows = args[2]
+        assert [row[:3] for row in rows] == [('booking-123', 'booking-123', 1), ('booking-123', 'booking-123', 2)]
+        assert 'outbound' in rows[0]  # Schema default for an omitted segment_type
+        assert 'return' in rows[1]
+        assert kwargs['page_size'] == 2
+        assert kwargs['fetch'] is True
+    
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_add_flight_segments_empty(self, mock_execute_values, booking_service, mock_storage):
+        """Test that no INSERT runs without segments"""
+        # Act
+        result = booking_service.add_flight_segments('booking-123', [])
+        
+        # Assert
+        assert result == []
+        mock_execute_values.assert_not_called()
     
     def test_get_booking_flight_segments(self, booking_service, mock_storage):
         """Test getting booking flight segments"""
@@ -853,11 +1234,11 @@ class TestBookingStorageService:
                 'AA', 'American Airlines', 'AA1234', 'Boeing 737',
                 'NYC', 'T1', datetime(2024, 6, 15, 8, 0),
                 'LAX', 'T2', datetime(2024, 6, 15, 11, 30),
-                210, 2475, 'scheduled', '{}', None, None, 0, 'A12',
+                210, 2475, 'scheduled', None, None, 0, 'A12',
                 datetime.now(), datetime.now()
             ]
         ]
-        mock_cursor.fetchall.return_value = segment_rows
+        mock_cursor.__iter__.return_value = iter(segment_rows)
         
         # Act
         result = booking_service.get_booking_flight_segments('booking-123')
@@ -869,12 +1250,16 @@ class TestBookingStorageService:
         assert result[0].airline_code == 'AA'
         assert result[0].flight_number == 'AA1234'
         assert result[0].duration_minutes == 210
+        
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "ORDER BY segment_sequence" in prepare_sql
     
     # ====================================================================
     # TIMELINE EVENT MANAGEMENT TESTS
     # ====================================================================
     
-    def test_add_timeline_event_success(self, booking_service, mock_storage):
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_add_timeline_event_success(self, mock_execute_values, booking_service, mock_storage):
         """Test adding timeline event"""
         # Arrange
         mock_cursor = MagicMock()
@@ -891,16 +1276,45 @@ class TestBookingStorageService:
         
         # Assert
         assert result is True
-        mock_cursor.execute.assert_called_once()
+        mock_execute_values.assert_called_once()
         
-        execute_call = mock_cursor.execute.call_args[0]
-        assert "INSERT INTO booking_timeline" in execute_call[0]
+        args, kwargs = mock_execute_values.call_args
+        assert "INSERT INTO booking_timeline" in args[1]
+        assert kwargs['page_size'] == 1
         
         # Verify parameters
-        params = mock_cursor.execute.call_args[0][1]
-        assert params[0] == 'booking-123'
-        assert params[1] == 'payment_completed'
-        assert params[4] == 456  # triggered_by_user_id
+        row = args[2][0]
+        assert row[0] == 'booking-123'
+        assert row[1] == 'payment_completed'
+        assert row[4] == 456  # triggered_by_user_id
+    
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_add_timeline_event_failure(self, mock_execute_values, booking_service, mock_storage):
+        """Test that a failed timeline insert is reported to the caller"""
+        # Arrange
+        mock_execute_values.side_effect = Exception("Connection lost")
+        
+        # Act
+        result = booking_service.add_timeline_event('booking-123', 'payment_completed')
+        
+        # Assert
+        assert result is False
+    
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_add_timeline_events_single_insert(self, mock_execute_values, booking_service, mock_storage):
+        """Test writing several timeline events with one INSERT"""
+        # Act
+        result = booking_service.add_timeline_events([
+            {'booking_id': 'booking-123', 'event_type': 'passenger_added'},
+            {'booking_id': 'booking-123', 'event_type': 'passenger_updated', 'triggered_by_user_id': 456}
+        ])
+        
+        # Assert
+        assert result is True
+        mock_execute_values.assert_called_once()
+        args, kwargs = mock_execute_values.call_args
+        assert [row[1] for row in args[2]] == ['passenger_added', 'passenger_updated']
+        assert kwargs['page_size'] == 2
     
     def test_get_booking_timeline(self, booking_service, mock_storage):
         """Test getting booking timeline"""
@@ -908,17 +1322,18 @@ class TestBookingStorageService:
         mock_cursor = MagicMock()
         mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
         
+        # JSONB event data arrives already decoded
         timeline_rows = [
             [
                 1, 'booking-123', 'booking_created', 'Booking created',
-                '{"initial": true}', 456, False, datetime.now()
+                {"initial": True}, 456, False, datetime.now()
             ],
             [
                 2, 'booking-123', 'payment_completed', 'Payment processed',
-                '{"amount": 299.99}', 456, False, datetime.now()
+                {"amount": 299.99}, 456, False, datetime.now()
             ]
         ]
-        mock_cursor.fetchall.return_value = timeline_rows
+        mock_cursor.__iter__.return_value = iter(timeline_rows)
         
         # Act
         result = booking_service.get_booking_timeline('booking-123')
@@ -928,10 +1343,12 @@ class TestBookingStorageService:
         assert isinstance(result[0], BookingTimelineEvent)
         assert result[0].event_type == 'booking_created'
         assert result[1].event_type == 'payment_completed'
+        assert result[1].event_data == {"amount": 299.99}
         
-        # Verify ordering (DESC by created_at)
-        execute_call = mock_cursor.execute.call_args[0]
-        assert "ORDER BY created_at DESC" in execute_call[0]
+        # Verify ordering (DESC by created_at) and the default page
+        prepare_sql = mock_cursor.execute.call_args_list[0][0][0]
+        assert "ORDER BY created_at DESC" in prepare_sql
+        assert mock_cursor.execute.call_args_list[1][0][1] == ('booking-123', 100, 0)
     
     # ====================================================================
     # TOOL OPERATION HANDLER TESTS
@@ -1005,30 +1422,6 @@ class TestBookingStorageService:
         assert 'error' in result
         assert 'Unknown operation' in result['error']
     
-    # ====================================================================
-    # UTILITY METHODS TESTS
-    # ====================================================================
-    
-    def test_generate_booking_reference_format(self, booking_service):
-        """Test booking reference generation format"""
-        # Act
-        reference = booking_service._generate_booking_reference()
-        
-        # Assert
-        assert len(reference) == 8  # 3 letters + 3 numbers + 2 letters
-        assert reference[:3].isalpha()  # First 3 are letters
-        assert reference[3:6].isdigit()  # Next 3 are digits
-        assert reference[6:].isalpha()  # Last 2 are letters
-        assert reference.isupper()  # All uppercase
-    
-    def test_generate_booking_reference_uniqueness(self, booking_service):
-        """Test that booking references are unique"""
-        # Act
-        references = [booking_service._generate_booking_reference() for _ in range(100)]
-        
-        # Assert
-        assert len(set(references)) == 100  # All should be unique
-    
     # ====================================================================
     # ERROR HANDLING TESTS
     # ====================================================================
@@ -1117,12 +1510,13 @@ class TestBookingStorageService:
                 assert parsed['segment_1'] == '12A'
                 break
     
-    def test_json_field_handling_flight_segments(self, booking_service, mock_storage):
-        """Test JSON field handling in flight segments"""
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_json_field_handling_flight_segments(self, mock_execute_values, booking_service, mock_storage):
+        """Test that segment fields outside the column layout are not bound"""
         # Arrange
         mock_cursor = MagicMock()
         mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
-        mock_cursor.fetchone.side_effect = [[1], ['segment-123']]
+        mock_execute_values.return_value = [('segment-123',)]
         
         segment_data = {
             'flight_offer_id': 'offer-123',
@@ -1135,16 +1529,9 @@ class TestBookingStorageService:
         # Assert
         assert result == 'segment-123'
         
-        # Verify JSON serialization
-        insert_call = mock_cursor.execute.call_args_list[1]
-        insert_values = insert_call[0][1]
-        
-        # Find the passenger_assignments value
-        for value in insert_values:
-            if isinstance(value, str) and 'passenger_1' in value:
-                parsed = json.loads(value)
-                assert parsed['passenger_1'] == '12A'
-                break
+        row = mock_execute_values.call_args[0][2][0]
+        assert 'offer-123' in row
+        assert not any(isinstance(value, dict) for value in row)
     
     def test_update_booking_json_fields(self, booking_service, mock_storage):
         """Test updating booking with JSON fields"""
@@ -1207,15 +1594,13 @@ class TestBookingStorageService:
         assert "MAX(passenger_sequence)" in sequence_call[0][0]
         assert "+ 1" in sequence_call[0][0]
     
-    def test_flight_segment_sequence_auto_increment(self, booking_service, mock_storage):
+    @patch('app.storage.services.booking_storage_service.execute_values')
+    def test_flight_segment_sequence_auto_increment(self, mock_execute_values, booking_service, mock_storage):
         """Test flight segment sequence auto-increments correctly"""
         # Arrange
         mock_cursor = MagicMock()
         mock_storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
-        mock_cursor.fetchone.side_effect = [
-            [2],  # Next sequence should be 2
-            ['segment-123']
-        ]
+        mock_execute_values.return_value = [('segment-123',)]
         
         # Act
         result = booking_service.add_flight_segment(
@@ -1232,10 +1617,12 @@ class TestBookingStorageService:
         # Assert
         assert result == 'segment-123'
         
-        # Verify the sequence query
-        sequence_call = mock_cursor.execute.call_args_list[0]
-        assert "MAX(segment_sequence)" in sequence_call[0][0]
-        assert "booking_flight_segments" in sequence_call[0][0]
+        # Verify each row numbers itself after the booking's last segment
+        template = mock_execute_values.call_args[1]['template']
+        assert "MAX(segment_sequence)" in template
+        assert "booking_flight_segments" in template
+        row = mock_execute_values.call_args[0][2][0]
+        assert row[1:3] == ('booking-123', 1)
     
     # ====================================================================
     # INTEGRATION TESTS FOR NEW STRUCTURE
@@ -407,8 +407,9 @@ class TestPassengerStorageService:
         execute_call = mock_cursor.execute.call_args[0]
         execute_params = mock_cursor.execute.call_args[0][1]
         
-        # Verify JSON serialization
-        assert json.dumps(airline_loyalties) in execute_params
+        # Verify JSON serialization (compact with orjson, spaced with stdlib json)
+        json_params = [p for p in execute_params if isinstance(p, str) and p.startswith('{')]
+        assert [json.loads(p) for p in json_params] == [airline_loyalties]
     
     def test_passenger_not_found(self, passenger_service, mock_storage):
         """Test getting non-existent passenger"""
@@ -0,0 +1,122 @@
+# ==============================================================================
+# tests/storage/test_db_service.py
+# ==============================================================================
+import pytest
+from unittest.mock import MagicMock
+from app.storage.db_service import StorageService, execute_prepared
+
+class TestExecutePrepared:
+    
+    def test_prepares_once_per_connection(self):
+        """Test that a statement is prepared on first use and executed after that"""
+        # Arrange
+        mock_cursor = MagicMock()
+        
+        # Act
+        execute_prepared(mock_cursor, 'get_thing', 'SELECT * FROM things WHERE id = $1', (1,))
+        execute_prepared(mock_cursor, 'get_thing', 'SELECT * FROM things WHERE id = $1', (2,))
+        
+        # Assert
+        assert [call[0] for call in mock_cursor.execute.call_args_list] == [
+            ('PREPARE get_thing AS SELECT * FROM things WHERE id = $1',),
+            ('EXECUTE get_thing (%s)', (1,)),
+            ('EXECUTE get_thing (%s)', (2,)),
+        ]
+    
+    def test_prepares_again_on_new_connection(self):
+        """Test that each connection prepares its own copy of the statement"""
+        # Arrange
+        first_cursor = MagicMock()
+        second_cursor = MagicMock()
+        
+        # Act
+        execute_prepared(first_cursor, 'get_thing', 'SELECT * FROM things WHERE id = $1', (1,))
+        execute_prepared(second_cursor, 'get_thing', 'SELECT * FROM things WHERE id = $1', (1,))
+        
+        # Assert
+        assert first_cursor.execute.call_count == 2
+        assert second_cursor.execute.call_count == 2
+        assert second_cursor.execute.call_args_list[0][0][0].startswith('PREPARE get_thing')
+    
+    def test_executes_without_params(self):
+        """Test executing a statement that takes no parameters"""
+        # Arrange
+        mock_cursor = MagicMock()
+        
+        # Act
+        execute_prepared(mock_cursor, 'count_things', 'SELECT COUNT(*) FROM things')
+        
+        # Assert
+        mock_cursor.execute.assert_called_with('EXECUTE count_things')
+
+class TestStorageServiceConnections:
+    
+    @pytest.fixture
+    def storage(self, monkeypatch):
+        """Storage service with a mocked connection and pool"""
+        monkeypatch.delenv('DATABASE_URL', raising=False)
+        storage = StorageService()
+        storage.conn = MagicMock()
+        storage.pool = MagicMock()
+        storage.pool.getconn.return_value.closed = 0
+        return storage
+    
+    def test_get_conn_checks_out_pooled_connection(self, storage):
+        """Test that a pooled autocommit connection is returned after the block"""
+        # Act
+        with storage.get_conn() as conn:
+            pass
+        
+        # Assert
+        assert conn is storage.pool.getconn.return_value
+        assert conn.autocommit is True
+        storage.pool.putconn.assert_called_once_with(conn, close=False)
+    
+    def test_get_conn_rolls_back_on_error(self, storage):
+        """Test that an error inside the block rolls back and still returns the connection"""
+        # Act
+        with pytest.raises(ValueError):
+            with storage.get_conn() as conn:
+                raise ValueError("query failed")
+        
+        # Assert
+        conn.rollback.assert_called_once()
+        storage.pool.putconn.assert_called_once_with(conn, close=False)
+    
+    def test_get_conn_discards_broken_connection(self, storage):
+        """Test that a connection that closed inside the block is not reused"""
+        # Act
+        with pytest.raises(ValueError):
+            with storage.get_conn() as conn:
+                conn.closed = 2
+                raise ValueError("server closed the connection")
+        
+        # Assert
+        conn.rollback.assert_not_called()
+        storage.pool.putconn.assert_called_once_with(conn, close=True)
+    
+    def test_get_conn_without_pool(self, storage):
+        """Test falling back to the shared connection when there is no pool"""
+        # Arrange
+        storage.pool = None
+        
+        # Act
+        with storage.get_conn() as conn:
+            pass
+        
+        # Assert
+        assert conn is storage.conn
+    
+    def test_cursor_uses_checked_out_connection(self, storage):
+        """Test that cursor() opens its cursor on a pooled connection"""
+        # Arrange
+        pooled_conn = storage.pool.getconn.return_value
+        
+        # Act
+        with storage.cursor() as cur:
+            pass
+        
+        # Assert
+        assert cur is pooled_conn.cursor.return_value.__enter__.return_value
+        storage.conn.cursor.assert_not_called()
+        storage.pool.putconn.assert_called_once_with(pooled_conn, close=False)
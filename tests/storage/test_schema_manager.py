@@ -0,0 +1,57 @@
+# ==============================================================================
+# tests/storage/test_schema_manager.py
+# ==============================================================================
+import pytest
+from unittest.mock import MagicMock
+from app.storage.schema_manager import SchemaManager
+
+class TestCreateAllTables:
+    
+    @pytest.fixture
+    def mock_cursor(self):
+        """Cursor that records every statement it executes"""
+        return MagicMock()
+    
+    @pytest.fixture
+    def schema(self):
+        """Schema with one table, one migration and one index"""
+        schema = MagicMock()
+        schema.get_table_definitions.return_value = ["CREATE TABLE IF NOT EXISTS things (id INT);"]
+        schema.get_migrations.return_value = ["ALTER TABLE things ADD COLUMN IF NOT EXISTS name TEXT;"]
+        schema.get_indexes.return_value = ["CREATE INDEX IF NOT EXISTS idx_things_name ON things(name);"]
+        return schema
+    
+    @pytest.fixture
+    def schema_manager(self, mock_cursor, schema):
+        """Schema manager with a single registered schema"""
+        storage = MagicMock()
+        storage.conn.cursor.return_value.__enter__.return_value = mock_cursor
+        manager = SchemaManager(storage)
+        manager.schema_dependencies = {'things': schema}
+        manager.dependencies = {'things': []}
+        return manager
+    
+    def test_migrations_run_between_tables_and_indexes(self, schema_manager, mock_cursor):
+        """Test that migrations run after the tables exist and before their indexes"""
+        # Act
+        result = schema_manager.create_all_tables()
+        
+        # Assert
+        assert result is True
+        assert [call[0][0] for call in mock_cursor.execute.call_args_list] == [
+            "CREATE TABLE IF NOT EXISTS things (id INT);",
+            "ALTER TABLE things ADD COLUMN IF NOT EXISTS name TEXT;",
+            "CREATE INDEX IF NOT EXISTS idx_things_name ON things(name);",
+        ]
+    
+    def test_failed_migration_fails_schema_creation(self, schema_manager, mock_cursor):
+        """Test that a failed migration stops before the indexes and reports failure"""
+        # Arrange
+        mock_cursor.execute.side_effect = [None, Exception("column type mismatch")]
+        
+        # Act
+        result = schema_manager.create_all_tables()
+        
+        # Assert
+        assert result is False
+        assert mock_cursor.execute.call_count == 2